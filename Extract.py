@@ -4,17 +4,31 @@
 import argparse
 import csv
 import json
+import os
 import sys
 import re
+import threading
+import queue
+import time
+import uuid
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
 from pathlib import Path
-from typing import Iterable, Optional, Tuple, List
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, List
 
+import numpy as np
 import pandas as pd
 
+from sketches import HyperLogLog, KLLSketch
+
 # Excel engines
 EXCEL_XLSX_ENGINE = "openpyxl"
 EXCEL_XLS_ENGINE = "xlrd"
 
+# Output buffering (bytes) for CSV writers
+DEFAULT_WRITE_BUFFER = 1 << 20
+
 # Optional backends
 _HAS_PYARROW = False
 try:
@@ -30,28 +44,830 @@ def safe_slug(s: str) -> str:
     return s or "unnamed"
 
 
+def excel_engine(path: Path) -> str:
+    return EXCEL_XLSX_ENGINE if Path(path).suffix.lower() == ".xlsx" else EXCEL_XLS_ENGINE
+
+
+def parse_index_spec(spec: Optional[str]) -> Optional[set]:
+    """Parse a 1-based index selection like "1,3,5-8" into a set of ints (None = all)."""
+    if not spec:
+        return None
+    picked = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            picked.update(range(int(lo), int(hi) + 1))
+        else:
+            picked.add(int(part))
+    return picked
+
+
+# ---------- delimited-text dialect detection ----------
+
+SNIFF_BYTES = 64 * 1024
+SNIFF_LINES = 50
+DELIMITER_CANDIDATES = (",", "\t", ";", "|", ":")
+_BOMS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe\x00\x00", "utf-32"),
+    (b"\x00\x00\xfe\xff", "utf-32"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+
+
+class Dialect:
+    """Delimiter, quoting, header presence and input encoding of a delimited text file."""
+
+    def __init__(self, delimiter: str = ",", quotechar: str = '"', header: bool = True, encoding: str = "utf-8"):
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.header = header
+        self.encoding = encoding
+
+    def read_csv_kwargs(self) -> Dict:
+        return {"sep": self.delimiter, "quotechar": self.quotechar, "header": 0 if self.header else None,
+                "encoding": self.encoding}
+
+    def to_dict(self) -> Dict:
+        return {"delimiter": self.delimiter, "quotechar": self.quotechar, "header": self.header,
+                "encoding": self.encoding}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Dialect":
+        return cls(d["delimiter"], d["quotechar"], bool(d["header"]), d["encoding"])
+
+
+def detect_encoding(raw: bytes) -> str:
+    """Input encoding from a BOM, else strict UTF-8, else cp1252/latin-1 by byte statistics."""
+    for bom, name in _BOMS:
+        if raw.startswith(bom):
+            return name
+    for cut in range(4):  # the prefix may end inside a multi-byte character
+        try:
+            raw[:len(raw) - cut].decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError as e:
+            if e.start < len(raw) - 4:
+                break
+    try:
+        raw.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:  # 0x81/0x8d/0x8f/0x90/0x9d are undefined in cp1252
+        return "latin-1"
+
+
+def _looks_numeric(value: str) -> bool:
+    try:
+        float(value.replace(",", ""))
+        return True
+    except ValueError:
+        return False
+
+
+def _best_delimiter(lines: List[str], quotechar: str) -> Tuple[str, Tuple[float, int], List[List[str]]]:
+    """Delimiter whose csv.reader rows have the most consistent (then widest) field count."""
+    best, best_score, best_rows = ",", (-1.0, 0), []
+    for delim in DELIMITER_CANDIDATES:
+        if not any(delim in ln for ln in lines):
+            continue
+        rows = list(csv.reader(lines, delimiter=delim, quotechar=quotechar))
+        widths = [len(r) for r in rows]
+        modal = max(set(widths), key=widths.count)
+        score = (widths.count(modal) / len(widths), modal)  # consistency first, then width
+        if modal > 1 and score > best_score:
+            best, best_score, best_rows = delim, score, rows
+    return best, best_score, best_rows
+
+
+def _quoted_fields(lines: List[str], delimiter: str, quotechar: str) -> int:
+    """Fields wrapped whole in quotechar: opened at a line start or after the delimiter, closed before one or at a line end."""
+    d, q = re.escape(delimiter), re.escape(quotechar)
+    wrapped = re.compile(rf"(?:^|{d}){q}(?:[^{q}]|{q}{q})*{q}(?={d}|$)")
+    return sum(len(wrapped.findall(ln)) for ln in lines)
+
+
+def sniff_dialect(raw: bytes, encoding: Optional[str] = None) -> Dialect:
+    """Detect the dialect from one raw prefix of the file.
+
+    The quote character is '"' unless apostrophes wrap more whole fields than double quotes do
+    and parse at least as consistently; apostrophes inside values (O'Brien, rock'n'roll) don't count.
+    """
+    encoding = encoding or detect_encoding(raw)
+    text = raw.decode(encoding, errors="replace")
+    lines = text.splitlines()
+    if len(raw) >= SNIFF_BYTES and len(lines) > 1:
+        lines = lines[:-1]  # last line is probably truncated
+    lines = [ln for ln in lines if ln.strip()][:SNIFF_LINES]
+
+    quotechar = '"'
+    best, best_score, best_rows = _best_delimiter(lines, quotechar)
+    if "'" in text and _quoted_fields(lines, best, "'") > _quoted_fields(lines, best, '"'):
+        alt, alt_score, alt_rows = _best_delimiter(lines, "'")
+        if alt_score >= best_score:
+            quotechar, best, best_score, best_rows = "'", alt, alt_score, alt_rows
+
+    header = True
+    if len(best_rows) > 1:
+        first, body = best_rows[0], best_rows[1:]
+        votes = 0
+        for col, value in enumerate(first):
+            cells = [r[col] for r in body if col < len(r) and r[col] != ""]
+            if not cells:
+                continue
+            body_numeric = sum(_looks_numeric(c) for c in cells) > len(cells) / 2
+            if body_numeric:
+                votes += -1 if _looks_numeric(value) else 1
+        header = votes >= 0
+    return Dialect(best, quotechar, header, encoding)
+
+
+def infer_csv_schema(sample: pd.DataFrame) -> Dict[str, str]:
+    """Null-capable dtypes from a sample, chosen so every later chunk is written the same way.
+
+    Integer-valued float columns (ints with gaps) become Int64, so a NaN-free chunk and a chunk
+    with NaNs both print `1`, never `1.0`.
+    """
+    schema: Dict[str, str] = {}
+    for col, s in sample.items():
+        if pd.api.types.is_bool_dtype(s):
+            dtype = "boolean"
+        elif pd.api.types.is_integer_dtype(s):
+            dtype = "Int64"
+        elif pd.api.types.is_float_dtype(s):
+            values = s.dropna()
+            dtype = "Int64" if len(values) and bool((values == np.floor(values)).all()) else "float64"
+        else:
+            dtype = "string"
+        schema[str(col)] = dtype
+    return schema
+
+
+def read_schema_file(path: Path) -> Dict[str, str]:
+    """Column -> dtype from a {stem}.schema.json sidecar or a user schema ({"columns": {...}} or flat)."""
+    with open(path, "r", encoding="utf-8") as f:
+        obj = json.load(f)
+    return dict(obj.get("columns", obj))
+
+
+def schema_sidecar(csv_path: Path) -> Path:
+    return Path(csv_path).with_name(Path(csv_path).stem + ".schema.json")
+
+
+def feed_key(path: Path) -> str:
+    """Cache key for a producer's feed: directory plus file name with digit runs collapsed."""
+    return f"{path.parent.resolve()}/{re.sub(r'[0-9]+', '#', path.name)}"
+
+
+class DialectCache:
+    """Detected dialects per feed, optionally persisted to a JSON file shared across runs."""
+
+    _open: Dict[Optional[str], "DialectCache"] = {}
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self.entries: Dict[str, Dict] = {}
+        if self.path is not None and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @classmethod
+    def open(cls, path: Optional[Path] = None) -> "DialectCache":
+        """Process-wide cache instance for path (None = in-memory only)."""
+        key = str(Path(path).resolve()) if path else None
+        if key not in cls._open:
+            cls._open[key] = cls(path)
+        return cls._open[key]
+
+    def get(self, key: str) -> Optional[Dialect]:
+        d = self.entries.get(key)
+        return Dialect.from_dict(d) if d else None
+
+    def put(self, key: str, dialect: Dialect) -> None:
+        self.entries[key] = dialect.to_dict()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp, self.path)
+
+
+def validate_dialect(raw: bytes, dialect: Dialect) -> bool:
+    """Cheap check that a cached dialect still fits this file's prefix."""
+    try:
+        text = raw[:len(raw) - 4 if len(raw) >= 4096 else len(raw)].decode(dialect.encoding)
+    except (UnicodeDecodeError, LookupError):
+        return False
+    lines = [ln for ln in text.splitlines()[:10] if ln.strip()]
+    if len(lines) > 1 and len(raw) >= 4096:
+        lines = lines[:-1]
+    widths = {len(r) for r in csv.reader(lines, delimiter=dialect.delimiter, quotechar=dialect.quotechar)}
+    return len(widths) <= 1 and (not widths or widths.pop() > 1)
+
+
+# ---------- HTML table scanning ----------
+
+_TABLE_TAG = re.compile(rb"<(/?)table\b[^>]*>", re.IGNORECASE)
+_TAG_ID = re.compile(rb"""\bid\s*=\s*["']?([^"'\s>]+)""", re.IGNORECASE)
+
+
+def scan_html_tables(buf) -> List[Tuple[int, int, Optional[str]]]:
+    """Find every <table> region in raw HTML bytes without parsing the document.
+
+    Returns (start, end, id) byte offsets in document order, nested tables included (a parent's
+    region contains its children), so the numbering matches pd.read_html.
+    """
+    regions: List[Tuple[int, int, Optional[str]]] = []
+    open_tables: List[int] = []  # indices into regions of tables not closed yet
+    for m in _TABLE_TAG.finditer(buf):
+        if not m.group(1):
+            id_match = _TAG_ID.search(m.group(0))
+            table_id = id_match.group(1).decode("ascii", errors="replace") if id_match else None
+            open_tables.append(len(regions))
+            regions.append((m.start(), -1, table_id))
+        elif open_tables:
+            i = open_tables.pop()
+            regions[i] = (regions[i][0], m.end(), regions[i][2])
+    return [(start, end if end >= 0 else len(buf), tid) for start, end, tid in regions]
+
+
+# ---------- Feather ----------
+
+def _read_feather_head(path: Path, n: int) -> "pa.Table":
+    """First n rows of a Feather file, decompressing only the record batches they span (n=0: schema only)."""
+    import pyarrow as pa
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+    except pa.ArrowInvalid:  # Feather v1 is not an IPC file
+        import pyarrow.feather as pf
+        return pf.read_table(path, memory_map=True).slice(0, n)
+    batches, rows = [], 0
+    for i in range(reader.num_record_batches):
+        if rows >= n:
+            break
+        batch = reader.get_batch(i)
+        batches.append(batch)
+        rows += batch.num_rows
+    return pa.Table.from_batches(batches, schema=reader.schema).slice(0, n)
+
+
+# ---------- output ----------
+
+def _create_temp(out_path: Path) -> Tuple[int, str]:
+    """Create a hidden temp file next to out_path; returns (fd, path).
+
+    Unlike mkstemp (always 0600), the file is created 0666 and the kernel applies the umask,
+    so the renamed output gets the usual mode without touching the process umask.
+    """
+    while True:
+        tmp = str(out_path.with_name(f".{out_path.name}.{uuid.uuid4().hex}.tmp"))
+        try:
+            return os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+class CsvSink:
+    """One buffered handle per output CSV; written to a temp file, fsynced and renamed on success.
+
+    Use as a context manager. Readers never see a half-written file: the final path only
+    appears (atomically, via os.replace) once every chunk has been written.
+    """
+
+    def __init__(self, out_path: Path, encoding: str = "utf-8", buffer_size: int = DEFAULT_WRITE_BUFFER,
+                 fsync: bool = True, observer=None):
+        self.out_path = Path(out_path)
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.fsync = fsync
+        self.observer = observer
+        self.rows = 0
+        self._fh = None
+        self._tmp: Optional[str] = None
+        self._header = True
+
+    def __enter__(self) -> "CsvSink":
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp = _create_temp(self.out_path)
+        self._fh = open(fd, "w", encoding=self.encoding, newline="", buffering=self.buffer_size)
+        return self
+
+    def write(self, df: pd.DataFrame, index: bool = False) -> None:
+        df.to_csv(self._fh, index=index, header=self._header)
+        self._header = False
+        self.rows += len(df)
+        if self.observer is not None:
+            self.observer(df)
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            if exc_type is None:
+                self._fh.flush()
+                if self.fsync:
+                    os.fsync(self._fh.fileno())
+                self._fh.close()
+                os.replace(self._tmp, self.out_path)
+                self._tmp = None
+        finally:
+            if not self._fh.closed:
+                self._fh.close()
+            if self._tmp is not None and os.path.exists(self._tmp):
+                os.unlink(self._tmp)
+        return False
+
+
+# ---------- pipelined chunk conversion ----------
+
+DEFAULT_PIPELINE_DEPTH = 4
+# Encodings whose b"\n" and quote bytes can't occur inside another character, so raw blocks may be split on them
+_BYTE_SPLITTABLE = {"utf-8", "utf-8-sig", "cp1252", "latin-1", "ascii"}
+_DONE = object()
+
+
+class ChunkPipeline:
+    """read -> parse -> write over bounded queues so I/O and CPU overlap.
+
+    A prefetching reader thread pulls items from `source`, the calling thread runs `parse`,
+    and a background writer thread runs `write`. Busy seconds per stage are kept in self.timings.
+    """
+
+    def __init__(self, depth: int = DEFAULT_PIPELINE_DEPTH):
+        self.depth = depth
+        self.timings: Dict[str, float] = {"read": 0.0, "parse": 0.0, "write": 0.0, "wall": 0.0}
+
+    def run(self, source: Iterable, parse: Callable, write: Callable) -> Dict[str, float]:
+        raw_q: queue.Queue = queue.Queue(self.depth)
+        parsed_q: queue.Queue = queue.Queue(self.depth)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        timings = self.timings
+        started = time.perf_counter()
+
+        def put(q: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue):
+            while True:
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        return _DONE
+
+        def fail(e: BaseException) -> None:
+            errors.append(e)
+            stop.set()
+
+        def reader() -> None:
+            try:
+                it = iter(source)
+                while True:
+                    t = time.perf_counter()
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        break
+                    finally:
+                        timings["read"] += time.perf_counter() - t
+                    if not put(raw_q, item):
+                        return
+            except BaseException as e:
+                fail(e)
+            finally:
+                put(raw_q, _DONE)
+
+        def writer() -> None:
+            try:
+                while True:
+                    item = get(parsed_q)
+                    if item is _DONE:
+                        return
+                    t = time.perf_counter()
+                    write(item)
+                    timings["write"] += time.perf_counter() - t
+            except BaseException as e:
+                fail(e)
+
+        threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+        for th in threads:
+            th.start()
+        try:
+            while True:
+                item = get(raw_q)
+                if item is _DONE:
+                    break
+                t = time.perf_counter()
+                parsed = parse(item)
+                timings["parse"] += time.perf_counter() - t
+                if not put(parsed_q, parsed):
+                    break
+        except BaseException as e:
+            fail(e)
+        finally:
+            put(parsed_q, _DONE)
+            for th in threads:
+                th.join()
+            timings["wall"] += time.perf_counter() - started
+        if errors:
+            raise errors[0]
+        return timings
+
+
+class NoRecordBoundary(Exception):
+    """No record boundary within max_record_bytes (e.g. an unbalanced quote); offset is where splitting stopped."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"no record boundary after byte {offset}")
+        self.offset = offset
+
+
+def _scan_quotes(buf, quote: bytes, start: int, inside: bool) -> Tuple[int, bool]:
+    """One pass over buf[start:]: (offset just past the last newline outside quotes or 0, quote state at the end)."""
+    cut = 0
+    pos = start
+    while True:
+        q = buf.find(quote, pos)
+        end = len(buf) if q < 0 else q
+        if not inside:
+            nl = buf.rfind(b"\n", pos, end)
+            if nl >= 0:
+                cut = nl + 1
+        if q < 0:
+            return cut, inside
+        inside = not inside  # a doubled (escaped) quote toggles twice
+        pos = q + 1
+
+
+def iter_record_blocks(path: Path, block_size: int, quotechar: str = '"',
+                       max_record_bytes: Optional[int] = None) -> Iterator[bytes]:
+    """Raw byte blocks of a delimited file, each ending on a record boundary.
+
+    Quote state is carried across blocks, so every byte is scanned once. Raises NoRecordBoundary
+    when max_record_bytes (default 8 blocks) pass without a boundary; blocks already yielded stay valid.
+    """
+    quote = quotechar.encode("ascii")
+    max_record_bytes = max_record_bytes or 8 * block_size
+    carry = bytearray()
+    inside = False  # quote state at the end of carry
+    offset = 0  # file offset of carry[0]
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                if carry:
+                    yield bytes(carry)
+                return
+            start = len(carry)
+            carry += data
+            cut, inside = _scan_quotes(carry, quote, start, inside)
+            if cut == 0:
+                if len(carry) > max_record_bytes:
+                    raise NoRecordBoundary(offset)
+                continue  # one record longer than a block; keep reading
+            yield bytes(carry[:cut])
+            del carry[:cut]
+            offset += cut
+
+
+# ---------- profiling ----------
+
+PROFILE_QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+class ColumnProfile:
+    """Streaming statistics for one column; updated per chunk and mergeable."""
+
+    def __init__(self, hll_p: int = 12, kll_k: int = 200):
+        self.count = 0
+        self.nulls = 0
+        self.dtypes: Dict[str, int] = {}
+        self.min = None
+        self.max = None
+        self.sum = 0.0
+        self.distinct = HyperLogLog(p=hll_p)
+        self.quantiles: Optional[KLLSketch] = None
+        self.kll_k = kll_k
+
+    def update(self, s: pd.Series) -> None:
+        self.count += len(s)
+        dtype = str(s.dtype)
+        self.dtypes[dtype] = self.dtypes.get(dtype, 0) + len(s)
+        values = s.dropna()
+        self.nulls += len(s) - len(values)
+        if values.empty:
+            return
+        self.distinct.update(values)
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if self.quantiles is None:
+                self.quantiles = KLLSketch(k=self.kll_k)
+            self.quantiles.update(values.to_numpy(dtype="float64"))
+            self.sum += float(values.sum())
+            self._update_range(float(values.min()), float(values.max()))
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            self._update_range(values.min().isoformat(), values.max().isoformat())
+
+    def _update_range(self, lo, hi) -> None:
+        try:
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        except TypeError:  # numeric in one chunk, datetime in another
+            self.min = self.max = None
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        self.count += other.count
+        self.nulls += other.nulls
+        for dtype, n in other.dtypes.items():
+            self.dtypes[dtype] = self.dtypes.get(dtype, 0) + n
+        self.sum += other.sum
+        if other.min is not None:
+            self._update_range(other.min, other.max)
+        self.distinct.merge(other.distinct)
+        if other.quantiles is not None:
+            if self.quantiles is None:
+                self.quantiles = KLLSketch(k=other.quantiles.k)
+            self.quantiles.merge(other.quantiles)
+        return self
+
+    def to_dict(self) -> Dict:
+        numeric = self.quantiles is not None and self.quantiles.n > 0
+        non_null = self.count - self.nulls
+        return {
+            "count": self.count,
+            "nulls": self.nulls,
+            "null_fraction": self.nulls / self.count if self.count else 0.0,
+            "dtypes": self.dtypes,
+            "distinct_estimate": self.distinct.estimate() if non_null else 0,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.quantiles.n if numeric else None,
+            "quantiles": dict(zip((str(q) for q in PROFILE_QUANTILES), self.quantiles.quantiles(PROFILE_QUANTILES)))
+            if numeric else None,
+            "sketches": {
+                "hll": self.distinct.to_dict(),
+                "kll": self.quantiles.to_dict() if self.quantiles is not None else None,
+                "sum": self.sum,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "ColumnProfile":
+        sketches = d["sketches"]
+        col = cls()
+        col.count, col.nulls = int(d["count"]), int(d["nulls"])
+        col.dtypes = dict(d["dtypes"])
+        col.min, col.max, col.sum = d["min"], d["max"], float(sketches["sum"])
+        col.distinct = HyperLogLog.from_dict(sketches["hll"])
+        if sketches.get("kll") is not None:
+            col.quantiles = KLLSketch.from_dict(sketches["kll"])
+            col.kll_k = col.quantiles.k
+        return col
+
+
+class TableProfile:
+    """Per-column profiles of one output table (or several merged tables)."""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.rows += len(df)
+        for name in df.columns:
+            key = str(name)
+            if key not in self.columns:
+                self.columns[key] = ColumnProfile()
+            try:
+                self.columns[key].update(df[name])
+            except Exception as e:  # profiling must never fail the conversion it observes
+                print(f"Warning: profile of column {key!r} is incomplete ({type(e).__name__}: {e}).")
+
+    def merge(self, other: "TableProfile") -> "TableProfile":
+        self.rows += other.rows
+        for key, col in other.columns.items():
+            if key in self.columns:
+                self.columns[key].merge(col)
+            else:
+                self.columns[key] = ColumnProfile.from_dict(col.to_dict())
+        return self
+
+    def to_dict(self) -> Dict:
+        return {"rows": self.rows, "columns": {k: c.to_dict() for k, c in self.columns.items()}}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "TableProfile":
+        prof = cls()
+        prof.rows = int(d["rows"])
+        prof.columns = {k: ColumnProfile.from_dict(c) for k, c in d["columns"].items()}
+        return prof
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    @classmethod
+    def read(cls, path: Path) -> "TableProfile":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def merge_profiles(paths: Iterable[Path]) -> TableProfile:
+    """Combine {stem}.profile.json sidecars (e.g. from parallel runs) into one profile."""
+    merged = TableProfile()
+    for p in paths:
+        merged.merge(TableProfile.read(Path(p)))
+    return merged
+
+
 class Extract:
     """Convert a single input file (self.source) to CSV(s) under self.destination."""
 
-    def __init__(self, source: Path, destination: Path):
+    def __init__(self, source: Path, destination: Path, profile: bool = False,
+                 buffer_size: int = DEFAULT_WRITE_BUFFER, fsync: bool = True,
+                 tables: Optional[str] = None, table_id: Optional[str] = None, workers: Optional[int] = None,
+                 dialect_cache: Optional[Path] = None, pipeline_depth: int = DEFAULT_PIPELINE_DEPTH,
+                 schema: Optional[str] = None, schema_sample: int = 10_000, sheets: Optional[str] = None):
         self.source = Path(source)
         self.destination = Path(destination)
+        self.profile = profile
+        self.buffer_size = buffer_size
+        self.fsync = fsync
+        self.tables = parse_index_spec(tables)
+        self.table_id = re.compile(table_id) if table_id else None
+        self.workers = workers
+        self.dialects = DialectCache.open(dialect_cache)
+        self.pipeline_depth = pipeline_depth
+        self.schema = schema
+        self.schema_sample = schema_sample
+        self.sheets = sheets
+        self.stage_times: Dict[str, float] = {}
+        self.profiles: Dict[Path, TableProfile] = {}
+        self.sidecars: List[Path] = []
 
     # ---------- helpers ----------
 
+    def detect_dialect(self, sample_path: Path) -> Dialect:
+        """Delimiter, quoting, header and input encoding from one prefix read.
+
+        Files from the same feed (see feed_key) are sniffed once; later files only validate
+        the cached dialect against a small prefix and re-sniff if it no longer fits.
+        """
+        key = feed_key(sample_path)
+        cached = self.dialects.get(key)
+        if cached is not None:
+            with open(sample_path, "rb") as f:
+                raw = f.read(4096)
+            if validate_dialect(raw, cached):
+                return cached
+        with open(sample_path, "rb") as f:
+            raw = f.read(SNIFF_BYTES)
+        dialect = sniff_dialect(raw)
+        self.dialects.put(key, dialect)
+        return dialect
+
+    def resolve_schema(self, path: Path, read_kwargs: Dict) -> Optional[Dict[str, str]]:
+        """Schema for a delimited input: user file, "infer" (from a sample), or a sidecar next to the input."""
+        if self.schema == "infer":
+            return infer_csv_schema(pd.read_csv(path, nrows=self.schema_sample, **read_kwargs))
+        if self.schema:
+            return read_schema_file(Path(self.schema))
+        sidecar = schema_sidecar(path)
+        return read_schema_file(sidecar) if sidecar.exists() else None
+
+    def csv_read_kwargs(self, path: Path) -> Dict:
+        """pd.read_csv kwargs for a delimited input: detected dialect plus explicit dtypes when a schema applies."""
+        read_kwargs = self.detect_dialect(path).read_csv_kwargs()
+        schema = self.resolve_schema(path, read_kwargs)
+        if schema:
+            if read_kwargs["header"] is None:  # headerless: schema applies by position
+                read_kwargs["dtype"] = dict(enumerate(schema.values()))
+            else:
+                read_kwargs["dtype"] = schema
+        return read_kwargs
+
     def detect_delimiter(self, sample_path: Path, default: str = ",") -> str:
-        """Detect delimiter using csv.Sniffer on a small sample."""
+        """Detect delimiter (see detect_dialect)."""
         try:
-            with open(sample_path, "r", encoding="utf-8", errors="ignore") as f:
-                sample = f.read(8192)
-            dialect = csv.Sniffer().sniff(sample, delimiters=[",", "\t", ";", "|", ":"])
-            return dialect.delimiter
-        except Exception:
+            return self.detect_dialect(sample_path).delimiter
+        except OSError:
             return default
 
+    def open_csv(self, out_path: Path, encoding: str = "utf-8") -> CsvSink:
+        """Open an atomic, buffered CSV sink for out_path (profiled when enabled)."""
+        return CsvSink(out_path, encoding=encoding, buffer_size=self.buffer_size, fsync=self.fsync,
+                       observer=lambda df: self._observe(out_path, df))
+
     def write_csv(self, df: pd.DataFrame, out_path: Path, encoding: str = "utf-8", index: bool = False) -> None:
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(out_path, encoding=encoding, index=index)
+        with self.open_csv(out_path, encoding=encoding) as sink:
+            sink.write(df, index=index)
+
+    def _observe(self, out_path: Path, df: pd.DataFrame) -> None:
+        """Fold a written frame/chunk into the output's profile (when profiling)."""
+        if self.profile:
+            self.profiles.setdefault(out_path, TableProfile()).update(df)
+
+    def write_profiles(self) -> List[Path]:
+        """Write a {stem}.profile.json sidecar next to each profiled output."""
+        sidecars: List[Path] = []
+        for out_path, prof in self.profiles.items():
+            sidecar = out_path.with_name(out_path.stem + ".profile.json")
+            prof.write(sidecar)
+            sidecars.append(sidecar)
+        return sidecars
+
+    def _bytes_per_row(self, path: Path) -> int:
+        """Average line length in the file's first 64 KB (sizes pipeline read blocks)."""
+        with open(path, "rb") as f:
+            prefix = f.read(SNIFF_BYTES)
+        return max(1, len(prefix) // max(1, prefix.count(b"\n")))
+
+    def _run_pipeline(self, source: Iterable, parse: Optional[Callable], write: Callable) -> None:
+        """Run a ChunkPipeline and add its stage timings to self.stage_times."""
+        pipeline = ChunkPipeline(depth=self.pipeline_depth)
+        pipeline.run(source, parse or (lambda item: item), write)
+        for stage, seconds in pipeline.timings.items():
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+    # ---------- readers (yield DataFrames, streaming where the format allows) ----------
+
+    def _read_orc(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if not _HAS_PYARROW:
+            raise RuntimeError("ORC requires pyarrow; install pyarrow to read ORC files.")
+        import pyarrow.orc as pa_orc
+        return pa_orc.ORCFile(str(self.source)).read(columns=columns).to_pandas()
+
+    def iter_frames(self, encoding: str = "utf-8", chunksize: Optional[int] = None,
+                    columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Yield the source's rows as DataFrames (chunks of chunksize where the format streams).
+
+        Multi-table formats (Excel sheets, HTML tables) yield one frame per table. columns
+        projects the result; CSV, Parquet, Feather and ORC skip the other columns while reading.
+        """
+        path = self.source
+        ext = path.suffix.lower()
+        columns = list(columns) if columns is not None else None
+        if ext in {".csv", ".tsv", ".txt"}:
+            read_kwargs = self.csv_read_kwargs(path)
+            if columns is not None:
+                read_kwargs["usecols"] = columns
+            if chunksize:
+                frames = pd.read_csv(path, chunksize=chunksize, **read_kwargs)
+            else:
+                frames = [pd.read_csv(path, **read_kwargs)]
+        elif ext == ".parquet":
+            if chunksize and _HAS_PYARROW:
+                import pyarrow.parquet as pq
+                frames = (batch.to_pandas() for batch in
+                          pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns))
+            else:
+                frames = [pd.read_parquet(path, columns=columns)]
+        elif ext == ".json":
+            if chunksize and self._json_is_lines(path, encoding):
+                frames = pd.read_json(path, lines=True, encoding=encoding, chunksize=chunksize)
+            else:
+                frames = [self._read_json(encoding)]
+        elif ext in {".xlsx", ".xls"}:
+            engine = excel_engine(path)
+            frames = pd.read_excel(path, sheet_name=None, engine=engine).values()
+        elif ext in {".html", ".htm"}:
+            frames = pd.read_html(path, encoding=encoding)
+        elif ext == ".feather":
+            frames = [pd.read_feather(path, columns=columns)]
+        elif ext == ".xml":
+            frames = [pd.read_xml(path)]
+        elif ext == ".orc":
+            frames = [self._read_orc(columns)]
+        else:
+            raise ValueError(f"Unsupported file type: {ext}")
+        for frame in frames:
+            yield frame if columns is None else frame[columns]
+
+    def peek_schema(self, encoding: str = "utf-8", sample_rows: int = 1000) -> Dict[str, str]:
+        """Column -> dtype from metadata or a small sample, without reading the whole file where possible."""
+        path = self.source
+        ext = path.suffix.lower()
+        if ext in {".csv", ".tsv", ".txt"}:
+            sample = pd.read_csv(path, nrows=sample_rows, **self.csv_read_kwargs(path))
+        elif ext in {".parquet", ".feather"} and _HAS_PYARROW:
+            import pyarrow.parquet as pq
+            schema = pq.read_schema(path) if ext == ".parquet" else _read_feather_head(path, 0).schema
+            sample = schema.empty_table().to_pandas()
+        elif ext == ".json" and self._json_is_lines(path, encoding):
+            sample = pd.read_json(path, lines=True, encoding=encoding, nrows=sample_rows)
+        else:
+            frames = list(self.iter_frames(encoding))
+            sample = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return {str(c): str(t) for c, t in sample.dtypes.items()}
 
     # ---------- converters (return list of CSV paths) ----------
 
@@ -60,66 +876,138 @@ class Extract:
         path = self.source
         out_dir = self.destination
 
-        delimiter = self.detect_delimiter(path)
+        # input encoding is detected; `encoding` governs the output
+        read_kwargs = self.csv_read_kwargs(path)
         outputs: List[Path] = []
         out_path = out_dir / (path.stem + ".csv")
+        try:
+            self._convert_delimited(path, out_path, read_kwargs, encoding, chunksize)
+        except (ValueError, TypeError) as e:
+            if "dtype" not in read_kwargs:
+                raise
+            raise RuntimeError(f"{path} does not match its schema ({e}); pass --schema FILE "
+                               f"or a larger --schema-sample") from e
+        if "dtype" in read_kwargs:
+            with open(schema_sidecar(out_path), "w", encoding="utf-8") as f:
+                json.dump({"source": str(path), "columns": {str(k): v for k, v in read_kwargs["dtype"].items()}},
+                          f, indent=2)
+
+        outputs.append(out_path)
+        return outputs
 
+    def _convert_delimited(self, path: Path, out_path: Path, read_kwargs: Dict, encoding: str,
+                           chunksize: Optional[int]) -> None:
         if chunksize:
-            first = True
-            for chunk in pd.read_csv(path, sep=delimiter, encoding=encoding, chunksize=chunksize):
-                mode = "w" if first else "a"
-                header = first
-                out_path.parent.mkdir(parents=True, exist_ok=True)
-                chunk.to_csv(out_path, encoding=encoding, index=False, header=header, mode=mode)
-                first = False
+            with self.open_csv(out_path, encoding=encoding) as sink:
+                if read_kwargs["encoding"].lower() in _BYTE_SPLITTABLE:
+                    block_size = max(1 << 20, chunksize * self._bytes_per_row(path))
+                    columns: List = []
+
+                    def parse(block) -> pd.DataFrame:
+                        if isinstance(block, pd.DataFrame):  # already parsed by the fallback reader
+                            return block
+                        if not columns:  # first block carries the header (if any)
+                            chunk = pd.read_csv(BytesIO(block), **read_kwargs)
+                            columns.extend(chunk.columns)
+                            return chunk
+                        return pd.read_csv(BytesIO(block), **dict(read_kwargs, header=None, names=columns))
+
+                    header = list(pd.read_csv(path, nrows=0, **read_kwargs).columns) if read_kwargs["header"] == 0 else None
+
+                    def blocks() -> Iterator:
+                        try:
+                            yield from iter_record_blocks(path, block_size, read_kwargs["quotechar"])
+                        except NoRecordBoundary as e:  # unbalanced quote or huge record: pandas splits the rest
+                            with open(path, "rb") as f:
+                                f.seek(e.offset)
+                                rest = dict(read_kwargs, header=None, names=header) if e.offset else read_kwargs
+                                yield from pd.read_csv(f, chunksize=chunksize, **rest)
+
+                    source = blocks()
+                else:  # multi-byte encodings: let pandas split records, still overlapped with writing
+                    source = pd.read_csv(path, chunksize=chunksize, **read_kwargs)
+                    parse = None
+                self._run_pipeline(source, parse, sink.write)
         else:
-            df = pd.read_csv(path, sep=delimiter, encoding=encoding)
+            df = pd.read_csv(path, **read_kwargs)
             self.write_csv(df, out_path, encoding=encoding, index=False)
 
-        outputs.append(out_path)
-        return outputs
+    def _run_table_jobs(self, func: Callable, jobs: List[Tuple], encoding: str) -> List[Path]:
+        """Run func(item, out_path, ...) per (item, out_path) job, in worker processes when there are several."""
+        args = [(item, out_path, encoding, self.buffer_size, self.fsync, self.profile) for item, out_path in jobs]
+        if len(args) > 1 and self.workers != 1:
+            with ProcessPoolExecutor(max_workers=min(len(args), self.workers or os.cpu_count() or 1)) as pool:
+                results = list(pool.map(func, *zip(*args)))
+        else:
+            results = [func(*a) for a in args]
+
+        for (_, out_path), prof in zip(jobs, results):
+            if prof is not None:
+                self.profiles[out_path] = TableProfile.from_dict(prof)
+        return [out_path for _, out_path in jobs]
+
+    def select_sheets(self, names: List[str]) -> List[str]:
+        """Sheets matching self.sheets (comma-separated exact names or full-match regexes); all when unset."""
+        if not self.sheets:
+            return list(names)
+        patterns = [p.strip() for p in self.sheets.split(",") if p.strip()]
+
+        def wanted(name: str) -> bool:
+            for p in patterns:
+                if name == p:
+                    return True
+                try:
+                    if re.fullmatch(p, name):
+                        return True
+                except re.error:
+                    continue
+            return False
+
+        return [n for n in names if wanted(n)]
 
     def convert_excel(self, encoding: str) -> List[Path]:
-        """Convert each sheet in an Excel file into separate CSVs."""
+        """Convert each (selected) sheet in an Excel file into separate CSVs.
+
+        With several selected sheets, each is converted in its own worker process that opens the
+        workbook independently (openpyxl read-only), so wall time tracks the slowest sheet.
+        """
         path = self.source
         out_dir = self.destination
-        outputs: List[Path] = []
 
         try:
-            xls = pd.ExcelFile(path, engine=EXCEL_XLSX_ENGINE if path.suffix.lower() == ".xlsx" else EXCEL_XLS_ENGINE)
+            xls = pd.ExcelFile(path, engine=excel_engine(path))
         except Exception as e:
             raise RuntimeError(f"Failed to open Excel file {path}: {e}") from e
 
-        for sheet in xls.sheet_names:
-            df = xls.parse(sheet_name=sheet)
-            sheet_slug = safe_slug(sheet)
-            out_path = out_dir / f"{path.stem}__sheet_{sheet_slug}.csv"
-            self.write_csv(df, out_path, encoding=encoding, index=False)
-            outputs.append(out_path)
-
-        return outputs
+        with xls:
+            sheets = self.select_sheets(xls.sheet_names)
+            jobs = [((str(path), sheet), out_dir / f"{path.stem}__sheet_{safe_slug(sheet)}.csv") for sheet in sheets]
+            if len(jobs) > 1 and self.workers != 1:
+                return self._run_table_jobs(_convert_sheet, jobs, encoding)
+            for (_, sheet), out_path in jobs:
+                self.write_csv(xls.parse(sheet_name=sheet), out_path, encoding=encoding, index=False)
+        return [out_path for _, out_path in jobs]
 
     def convert_parquet(self, encoding: str, chunksize: Optional[int]) -> List[Path]:
         """Convert Parquet to CSV."""
         path = self.source
         out_dir = self.destination
 
-        df = pd.read_parquet(path)
         out_path = out_dir / (path.stem + ".csv")
         outputs: List[Path] = []
 
-        if chunksize:
-            start = 0
-            first = True
-            while start < len(df):
-                chunk = df.iloc[start:start + chunksize]
-                mode = "w" if first else "a"
-                header = first
-                out_path.parent.mkdir(parents=True, exist_ok=True)
-                chunk.to_csv(out_path, encoding=encoding, index=False, header=header, mode=mode)
-                first = False
-                start += chunksize
+        if chunksize and _HAS_PYARROW:
+            import pyarrow.parquet as pq
+            with self.open_csv(out_path, encoding=encoding) as sink:
+                batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize)
+                self._run_pipeline(batches, lambda batch: batch.to_pandas(), sink.write)
+        elif chunksize:
+            df = pd.read_parquet(path)
+            with self.open_csv(out_path, encoding=encoding) as sink:
+                for start in range(0, len(df), chunksize):
+                    sink.write(df.iloc[start:start + chunksize])
         else:
+            df = pd.read_parquet(path)
             self.write_csv(df, out_path, encoding=encoding, index=False)
 
         outputs.append(out_path)
@@ -154,13 +1042,9 @@ class Extract:
             pass
         return False
 
-    def convert_json(self, encoding: str) -> List[Path]:
-        """Convert JSON or JSONL to CSV."""
+    def _read_json(self, encoding: str) -> pd.DataFrame:
+        """Load JSON or JSONL into one frame, normalizing nested structures."""
         path = self.source
-        out_dir = self.destination
-        outputs: List[Path] = []
-        out_path = out_dir / (path.stem + ".csv")
-
         try:
             if self._json_is_lines(path, encoding):
                 df = pd.read_json(path, lines=True, encoding=encoding)
@@ -173,22 +1057,43 @@ class Extract:
             with open(path, "r", encoding=encoding) as f:
                 obj = json.load(f)
             df = pd.json_normalize(obj)
+        return df
 
+    def convert_json(self, encoding: str) -> List[Path]:
+        """Convert JSON or JSONL to CSV."""
+        path = self.source
+        out_dir = self.destination
+        outputs: List[Path] = []
+        out_path = out_dir / (path.stem + ".csv")
+
+        df = self._read_json(encoding)
         self.write_csv(df, out_path, encoding=encoding, index=False)
         outputs.append(out_path)
         return outputs
 
     def convert_html(self, encoding: str) -> List[Path]:
-        """Convert all tables in an HTML file into separate CSVs."""
+        """Convert the (selected) tables in an HTML file into separate CSVs.
+
+        <table> regions are located with a byte-level scan of the memory-mapped file; only the
+        selected regions (self.tables indices, self.table_id regex) are decoded and parsed,
+        in worker processes when there is more than one.
+        """
         path = self.source
         out_dir = self.destination
-        outputs: List[Path] = []
-        tables = pd.read_html(path, encoding=encoding)  # requires lxml
-        for i, df in enumerate(tables, start=1):
-            out_path = out_dir / f"{path.stem}__table_{i}.csv"
-            self.write_csv(df, out_path, encoding=encoding, index=False)
-            outputs.append(out_path)
-        return outputs
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            regions = scan_html_tables(buf)
+            if not regions:
+                raise ValueError(f"No tables found in {path}")
+            jobs = []
+            for i, (start, end, tid) in enumerate(regions, start=1):
+                if self.tables is not None and i not in self.tables:
+                    continue
+                if self.table_id is not None and not (tid and self.table_id.search(tid)):
+                    continue
+                fragment = buf[start:end].decode(encoding, errors="replace")
+                jobs.append((fragment, out_dir / f"{path.stem}__table_{i}.csv"))
+
+        return self._run_table_jobs(_convert_html_table, jobs, encoding)
 
     def convert_xml(self, encoding: str) -> List[Path]:
         """Convert simple XML table structures to CSV."""
@@ -202,7 +1107,104 @@ class Extract:
         self.write_csv(df, out_path, encoding=encoding, index=False)
         return [out_path]
 
+    # ---------- preview ----------
+
+    def _read_head(self, n: int, encoding: str) -> pd.DataFrame:
+        """First n rows (of the first table/sheet), reading as little as the format allows."""
+        path = self.source
+        ext = path.suffix.lower()
+        if ext in {".csv", ".tsv", ".txt"}:
+            return pd.read_csv(path, nrows=n, **self.csv_read_kwargs(path))
+        if ext == ".parquet" and _HAS_PYARROW:
+            import pyarrow.parquet as pq
+            batch = next(pq.ParquetFile(path).iter_batches(batch_size=n), None)
+            return batch.to_pandas() if batch is not None else pq.read_schema(path).empty_table().to_pandas()
+        if ext == ".feather" and _HAS_PYARROW:
+            return _read_feather_head(path, n).to_pandas()
+        if ext == ".orc" and _HAS_PYARROW:
+            import pyarrow.orc as pa_orc
+            of = pa_orc.ORCFile(str(path))
+            return of.read_stripe(0).to_pandas().head(n) if of.nstripes else self._read_orc()
+        if ext == ".json" and self._json_is_lines(path, encoding):
+            return pd.read_json(path, lines=True, encoding=encoding, nrows=n)
+        if ext in {".xlsx", ".xls"}:
+            engine = excel_engine(path)
+            return pd.read_excel(path, sheet_name=0, nrows=n, engine=engine)
+        if ext in {".html", ".htm"}:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                regions = scan_html_tables(buf)
+                if not regions:
+                    raise ValueError(f"No tables found in {path}")
+                start, end, _ = regions[0]
+                fragment = buf[start:end].decode(encoding, errors="replace")
+            return pd.read_html(StringIO(fragment), flavor="lxml")[0].head(n)
+        return next(self.iter_frames(encoding)).head(n)
+
+    def _read_parquet_sample(self, n: int, rng) -> pd.DataFrame:
+        """Uniform sample of n rows, reading only the row groups that hold sampled rows."""
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(self.source)
+        total = pf.metadata.num_rows
+        picked = np.sort(rng.choice(total, size=min(n, total), replace=False))
+        offsets = np.cumsum([0] + [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)])
+        groups = np.searchsorted(offsets, picked, side="right") - 1
+        parts = []
+        for g in np.unique(groups):
+            local = picked[groups == g] - offsets[g]
+            parts.append(pf.read_row_group(int(g)).take(pa.array(local)).to_pandas())
+        return pd.concat(parts, ignore_index=True) if parts else pf.schema_arrow.empty_table().to_pandas()
+
+    def preview(self, head: Optional[int] = None, sample: Optional[int] = None, fraction: Optional[float] = None,
+                seed: int = 0, encoding: str = "utf-8", chunksize: Optional[int] = None) -> List[Path]:
+        """Write {stem}.preview.csv plus {stem}.preview.schema.json (first rows, or a uniform sample).
+
+        head reads only the leading rows/row group; sample N reservoir-samples while streaming
+        (Parquet reads only the row groups holding sampled rows); fraction keeps each row with
+        probability f while streaming.
+        """
+        if sum(x is not None for x in (head, sample, fraction)) != 1:
+            raise ValueError("preview needs exactly one of head, sample or fraction")
+        rng = np.random.default_rng(seed)
+        chunksize = chunksize or 100_000
+        ext = self.source.suffix.lower()
+
+        if head is not None:
+            df, method = self._read_head(head, encoding), f"head {head}"
+        elif sample is not None and ext == ".parquet" and _HAS_PYARROW:
+            df, method = self._read_parquet_sample(sample, rng), f"row-group sample {sample}"
+        elif sample is not None:
+            reservoir, keys = None, np.empty(0)
+            for chunk in self.iter_frames(encoding, chunksize):
+                # keeping the n smallest uniform keys is a streaming uniform sample without replacement
+                merged = chunk if reservoir is None else pd.concat([reservoir, chunk], ignore_index=True)
+                all_keys = np.concatenate([keys, rng.random(len(chunk))])
+                keep = np.sort(np.argsort(all_keys, kind="stable")[:sample])
+                reservoir, keys = merged.iloc[keep].reset_index(drop=True), all_keys[keep]
+            df, method = (reservoir if reservoir is not None else pd.DataFrame()), f"reservoir sample {sample}"
+        else:
+            if not 0 < fraction <= 1:
+                raise ValueError(f"sample fraction must be in (0, 1], got {fraction}")
+            parts = [chunk[rng.random(len(chunk)) < fraction] for chunk in self.iter_frames(encoding, chunksize)]
+            df, method = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(), f"fraction {fraction}"
+
+        out_path = self.destination / f"{self.source.stem}.preview.csv"
+        self.write_csv(df, out_path, encoding=encoding, index=False)
+        schema_path = self.destination / f"{self.source.stem}.preview.schema.json"
+        with open(schema_path, "w", encoding="utf-8") as f:
+            json.dump({"source": str(self.source), "method": method, "rows": len(df),
+                       "columns": {str(c): str(t) for c, t in df.dtypes.items()}}, f, indent=2)
+        return [out_path, schema_path]
+
     def convert(self, encoding: str = "utf-8", chunksize: Optional[int] = None) -> List[Path]:
+        """Convert self.source, then write profile sidecars if profiling is enabled."""
+        self.profiles = {}
+        self.sidecars: List[Path] = []
+        outputs = self._convert(encoding, chunksize)
+        if self.profile:
+            self.sidecars = self.write_profiles()
+        return outputs
+
+    def _convert(self, encoding: str, chunksize: Optional[int]) -> List[Path]:
         """Dispatch based on extension."""
         ext = self.source.suffix.lower()
         if ext in {".csv", ".tsv", ".txt"}:
@@ -222,10 +1224,7 @@ class Extract:
         elif ext == ".orc":
             if not _HAS_PYARROW:
                 raise RuntimeError("ORC requires pyarrow; install pyarrow to read ORC files.")
-            import pyarrow.orc as pa_orc
-            with pa_orc.ORCFile(str(self.source)) as of:
-                tbl = of.read()
-            df = tbl.to_pandas()
+            df = self._read_orc()
             out_path = self.destination / (self.source.stem + ".csv")
             self.write_csv(df, out_path, encoding=encoding, index=False)
             return [out_path]
@@ -233,6 +1232,191 @@ class Extract:
             raise ValueError(f"Unsupported file type: {ext}")
 
 
+# ---------- multi-file merge ----------
+
+def promote_dtype(a: Optional[str], b: str) -> str:
+    """Smallest common dtype of two column dtypes (bool < int < float, otherwise string)."""
+    if a is None or a == b:
+        return b
+    kinds = {}
+    for t in (a, b):
+        dt = pd.api.types.pandas_dtype(t)
+        if pd.api.types.is_bool_dtype(dt):
+            kinds[t] = 0
+        elif pd.api.types.is_integer_dtype(dt):
+            kinds[t] = 1
+        elif pd.api.types.is_float_dtype(dt):
+            kinds[t] = 2
+        else:
+            kinds[t] = None
+    if kinds[a] is None or kinds[b] is None:
+        return "string"
+    return ("boolean", "Int64", "float64")[max(kinds[a], kinds[b])]
+
+
+def unify_schemas(schemas: Iterable[Dict[str, str]]) -> Dict[str, str]:
+    """Union of columns (first-seen order) with promoted, null-capable dtypes."""
+    merged: Dict[str, Optional[str]] = {}
+    for schema in schemas:
+        for col, dtype in schema.items():
+            merged[col] = promote_dtype(merged.get(col), dtype)
+    nullable = {"bool": "boolean", "int8": "Int64", "int16": "Int64", "int32": "Int64", "int64": "Int64",
+                "uint8": "Int64", "uint16": "Int64", "uint32": "Int64", "uint64": "UInt64",
+                "object": "string", "str": "string", "float32": "float64"}
+    return {c: nullable.get(t, t) for c, t in merged.items()}
+
+
+def align_frame(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """Reorder/extend df to the unified schema and cast every column to its target dtype."""
+    df = df.rename(columns=str).reindex(columns=list(schema))
+    try:
+        return df.astype(schema)
+    except (TypeError, ValueError) as e:
+        raise RuntimeError(f"Chunk does not fit the merged schema ({e}); "
+                           f"increase --schema-sample so promotion sees these values.") from e
+
+
+def merge_into(paths: List[Path], out_path: Path, encoding: str = "utf-8", chunksize: Optional[int] = None,
+               source_column: Optional[str] = None, sample_rows: int = 1000,
+               buffer_size: int = DEFAULT_WRITE_BUFFER) -> int:
+    """Stream every input into one .csv or .parquet output with a unified schema; returns rows written.
+
+    Schemas are discovered from headers/metadata/samples, unified (union of columns, type
+    promotion), then every input is streamed once and appended to the single output.
+    """
+    out_path = Path(out_path)
+    ext = out_path.suffix.lower()
+    if ext not in {".csv", ".parquet"}:
+        raise ValueError(f"--merge-into supports .csv and .parquet outputs, got {ext}")
+    if ext == ".parquet" and not _HAS_PYARROW:
+        raise RuntimeError("Parquet output requires pyarrow; install pyarrow.")
+
+    schema = unify_schemas(Extract(p, out_path.parent).peek_schema(encoding, sample_rows) for p in paths)
+    if source_column:
+        schema[source_column] = "string"
+
+    rows = 0
+    if ext == ".csv":
+        with CsvSink(out_path, encoding=encoding, buffer_size=buffer_size) as sink:
+            for path in paths:
+                for chunk in Extract(path, out_path.parent).iter_frames(encoding, chunksize):
+                    if source_column:
+                        chunk = chunk.assign(**{source_column: path.name})
+                    sink.write(align_frame(chunk, schema))
+                    rows += len(chunk)
+        return rows
+
+    import pyarrow.parquet as pq
+    arrow_schema = pa.Schema.from_pandas(pd.DataFrame({c: pd.Series(dtype=t) for c, t in schema.items()}),
+                                         preserve_index=False)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = _create_temp(out_path)
+    os.close(fd)
+    try:
+        with pq.ParquetWriter(tmp, arrow_schema) as writer:
+            for path in paths:
+                for chunk in Extract(path, out_path.parent).iter_frames(encoding, chunksize):
+                    if source_column:
+                        chunk = chunk.assign(**{source_column: path.name})
+                    table = pa.Table.from_pandas(align_frame(chunk, schema), schema=arrow_schema, preserve_index=False)
+                    writer.write_table(table)
+                    rows += len(chunk)
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return rows
+
+
+# ---------- worker functions (module level so process pools can pickle them) ----------
+
+def _convert_html_table(fragment: str, out_path: Path, encoding: str, buffer_size: int, fsync: bool,
+                        profile: bool) -> Optional[Dict]:
+    """Parse one <table> fragment and write it to out_path; returns its profile dict when profiling."""
+    df = pd.read_html(StringIO(fragment), flavor="lxml")[0]
+    prof = TableProfile() if profile else None
+    with CsvSink(out_path, encoding=encoding, buffer_size=buffer_size, fsync=fsync,
+                 observer=prof.update if prof is not None else None) as sink:
+        sink.write(df)
+    return prof.to_dict() if prof is not None else None
+
+
+# ---------- run reports ----------
+
+def convert_one(path: Path, out_dir: Path, encoding: str = "utf-8", chunksize: Optional[int] = None,
+                preview: Optional[Dict] = None, **options) -> Dict:
+    """Convert (or preview) one input with Extract(**options); returns its run-report entry (never raises)."""
+    started = time.perf_counter()
+    entry: Dict = {"input": str(path), "status": "ok", "outputs": [], "profiles": []}
+    try:
+        extractor = Extract(source=path, destination=out_dir, **options)
+        if preview:
+            outs = extractor.preview(encoding=encoding, chunksize=chunksize, **preview)
+        else:
+            outs = extractor.convert(encoding=encoding, chunksize=chunksize)
+        entry["outputs"] = [str(o) for o in outs]
+        entry["profiles"] = [str(p) for p in extractor.sidecars]
+        if extractor.stage_times:
+            entry["stages"] = {k: round(v, 6) for k, v in extractor.stage_times.items()}
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = str(e)
+    entry["seconds"] = round(time.perf_counter() - started, 6)
+    return entry
+
+
+def build_run_report(entries: List[Dict]) -> Dict:
+    """Summarize run-report entries (from one process or merged from many workers)."""
+    entries = sorted(entries, key=lambda e: e["input"])
+    stages: Dict[str, float] = {}
+    for e in entries:
+        for stage, seconds in e.get("stages", {}).items():
+            stages[stage] = round(stages.get(stage, 0.0) + seconds, 6)
+    return {
+        "files": len(entries),
+        "converted": sum(1 for e in entries if e["status"] == "ok"),
+        "errors": sum(1 for e in entries if e["status"] != "ok"),
+        "outputs": sum(len(e["outputs"]) for e in entries),
+        "seconds": round(sum(e["seconds"] for e in entries), 6),
+        "stages": stages,
+        "entries": entries,
+    }
+
+
+def write_run_report(entries: List[Dict], report_path: Path, profile_path: Optional[Path] = None) -> Dict:
+    """Write the run report JSON, and a merged run profile when entries carry profile sidecars."""
+    report = build_run_report(entries)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    sidecars = [p for e in entries for p in e.get("profiles", [])]
+    if profile_path is not None and sidecars:
+        merge_profiles(sidecars).write(profile_path)
+    return report
+
+
+def print_summary(entries: List[Dict]) -> None:
+    report = build_run_report(entries)
+    print("\nSummary:")
+    print(f"  Converted files: {report['outputs']}")
+    print(f"  Errors: {report['errors']}")
+    for e in report["entries"]:
+        if e["status"] != "ok":
+            print(f"    - {e['input']}: {e.get('error')}")
+
+
+def _convert_sheet(job: Tuple[str, str], out_path: Path, encoding: str, buffer_size: int, fsync: bool,
+                   profile: bool) -> Optional[Dict]:
+    """Open the workbook read-only in this process, convert one sheet; returns its profile dict when profiling."""
+    path, sheet = job
+    df = pd.read_excel(path, sheet_name=sheet, engine=excel_engine(Path(path)))
+    prof = TableProfile() if profile else None
+    with CsvSink(out_path, encoding=encoding, buffer_size=buffer_size, fsync=fsync,
+                 observer=prof.update if prof is not None else None) as sink:
+        sink.write(df)
+    return prof.to_dict() if prof is not None else None
+
+
 # ---------- CLI utilities ----------
 
 def iter_paths(input_path: Path, pattern: Optional[str], recursive: bool) -> Iterable[Path]:
@@ -247,42 +1431,110 @@ def iter_paths(input_path: Path, pattern: Optional[str], recursive: bool) -> Ite
         raise FileNotFoundError(f"Input path not found: {input_path}")
 
 
+def extract_options(args) -> Dict:
+    """Extract(...) keyword options from parsed CLI args (shared by local and queue workers)."""
+    return {
+        "profile": args.profile,
+        "buffer_size": args.write_buffer,
+        "fsync": not args.no_fsync,
+        "tables": args.tables,
+        "table_id": args.table_id,
+        "workers": args.workers,
+        "dialect_cache": args.dialect_cache,
+        "pipeline_depth": args.pipeline_depth,
+        "schema": args.schema,
+        "schema_sample": args.schema_sample,
+        "sheets": args.sheets,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description="Convert tabular files to CSV.")
-    parser.add_argument("--input", "-i", required=True, help="Input file or directory.")
+    parser.add_argument("--input", "-i", default=None, help="Input file or directory.")
     parser.add_argument("--out", "-o", default="csv_out", help="Output directory.")
     parser.add_argument("--pattern", "-p", default=None, help='Glob pattern (e.g., "*.xlsx").')
     parser.add_argument("--recursive", "-r", action="store_true", help="Recursively search directories.")
     parser.add_argument("--encoding", "-e", default="utf-8", help="Output encoding (default: utf-8).")
     parser.add_argument("--chunksize", "-c", type=int, default=None, help="Row chunksize for large files.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write a {stem}.profile.json sidecar (nulls, min/max, distinct, quantiles) per output.")
+    parser.add_argument("--write-buffer", type=int, default=DEFAULT_WRITE_BUFFER,
+                        help=f"Output buffer size in bytes (default: {DEFAULT_WRITE_BUFFER}).")
+    parser.add_argument("--no-fsync", action="store_true", help="Skip fsync before renaming outputs into place.")
+    parser.add_argument("--tables", default=None, help='HTML: 1-based table indices to extract (e.g., "1,3,5-8").')
+    parser.add_argument("--table-id", default=None, help="HTML: only extract tables whose id matches this regex.")
+    parser.add_argument("--sheets", default=None,
+                        help='Excel: comma-separated sheet names or regexes to convert (e.g., "Summary,Q[1-4]_.*").')
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Worker processes for per-table/per-sheet conversion (default: CPU count).")
+    parser.add_argument("--dialect-cache", default=None,
+                        help="JSON file caching detected CSV dialects per feed, reused across runs.")
+    parser.add_argument("--pipeline-depth", type=int, default=DEFAULT_PIPELINE_DEPTH,
+                        help="Chunks buffered between the read, parse and write stages (default: 4).")
+    parser.add_argument("--head", type=int, default=None, help="Preview mode: write only the first N rows.")
+    parser.add_argument("--sample", type=int, default=None, help="Preview mode: uniform sample of N rows.")
+    parser.add_argument("--sample-fraction", type=float, default=None,
+                        help="Preview mode: keep each row with probability f.")
+    parser.add_argument("--seed", type=int, default=0, help="Preview mode: random seed for sampling.")
+    parser.add_argument("--merge-into", default=None,
+                        help="Merge every matched input into this single .csv/.parquet file instead of converting.")
+    parser.add_argument("--source-column", default=None, help="Merge mode: add a column holding the source file name.")
+    parser.add_argument("--schema", default=None,
+                        help='Delimited inputs: "infer" (from --schema-sample rows) or a schema JSON file; dtypes are '
+                             "applied to every chunk and written to {stem}.schema.json.")
+    parser.add_argument("--schema-sample", type=int, default=10_000,
+                        help="Rows sampled for schema inference and merge-mode discovery (default: 10000).")
+    parser.add_argument("--report", default=None, help="Write a JSON run report to this path.")
+    parser.add_argument("--queue", default=None,
+                        help="Shared-filesystem work queue directory for multi-node runs (see --role).")
+    parser.add_argument("--role", choices=["coordinator", "worker", "collect"], default=None,
+                        help="Queue mode: enqueue inputs, claim and convert them, or merge the run reports.")
+    parser.add_argument("--heartbeat", type=float, default=10.0, help="Queue worker heartbeat interval in seconds.")
+    parser.add_argument("--stale-after", type=float, default=60.0,
+                        help="Reclaim work from queue workers silent for this many seconds.")
     args = parser.parse_args()
 
+    if args.queue:
+        import workqueue
+        workqueue.run_cli(args)
+        return
+    if args.input is None:
+        parser.error("--input is required")
+
     in_path = Path(args.input)
     out_dir = Path(args.out)
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    converted: List[Path] = []
-    errors: List[Tuple[Path, str]] = []
+    if args.merge_into:
+        paths = sorted(p for p in iter_paths(in_path, args.pattern, args.recursive) if p.is_file())
+        rows = merge_into(paths, Path(args.merge_into), encoding=args.encoding, chunksize=args.chunksize,
+                          source_column=args.source_column, sample_rows=args.schema_sample,
+                          buffer_size=args.write_buffer)
+        print(f"✔ Merged {len(paths)} files ({rows} rows) -> {args.merge_into}")
+        return
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries: List[Dict] = []
+    preview = None
+    if args.head is not None or args.sample is not None or args.sample_fraction is not None:
+        preview = {"head": args.head, "sample": args.sample, "fraction": args.sample_fraction, "seed": args.seed}
 
     for path in iter_paths(in_path, args.pattern, args.recursive):
         if not path.is_file():
             continue
-        try:
-            extractor = Extract(source=path, destination=out_dir)
-            outs = extractor.convert(encoding=args.encoding, chunksize=args.chunksize)
-            converted.extend(outs)
-            print(f"✔ Converted: {path} -> {', '.join(str(o) for o in outs)}")
-        except Exception as e:
-            msg = f"✖ Error converting {path}: {e}"
-            print(msg, file=sys.stderr)
-            errors.append((path, str(e)))
+        entry = convert_one(path, out_dir, args.encoding, args.chunksize, preview=preview, **extract_options(args))
+        entries.append(entry)
+        if entry["status"] == "ok":
+            print(f"✔ Converted: {path} -> {', '.join(entry['outputs'])}")
+        else:
+            print(f"✖ Error converting {path}: {entry['error']}", file=sys.stderr)
 
-    print("\nSummary:")
-    print(f"  Converted files: {len(converted)}")
-    print(f"  Errors: {len(errors)}")
-    if errors:
-        for p, m in errors:
-                       print(f"    - {p}: {m}")
+    if args.report:
+        write_run_report(entries, Path(args.report))
+    sidecars = [p for e in entries for p in e["profiles"]]
+    if args.profile and sidecars:
+        merge_profiles(sidecars).write(out_dir / "_run.profile.json")
+
+    print_summary(entries)
 
 
 if __name__ == "__main__":
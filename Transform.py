@@ -1,25 +1,1080 @@
+import collections
+import contextlib
+import functools
+import inspect
+import logging
+import math
+import operator
+import shutil
+import tempfile
+import warnings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import arrow_backend
+from resultcache import DEFAULT_CACHE_BYTES, ResultCache, UncacheableResult, cache_key, source_fingerprint
+from sketches import NumericSummary
+
 from Extract import *
 
+
+def _stage_key(name, params):
+    key = (name, params)
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return (name, repr(params))
+
+
+def memoized_stage(func):
+    """Run a stage at most once per (stage, parameters) until self.df changes."""
+    signature = inspect.signature(func)
+    @functools.wraps(func)
+    def inner(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()  # f() and f(engine=<default>) share one cache entry
+        key = _stage_key(func.__name__, tuple(bound.arguments.items())[1:])
+        if key not in self._stage_cache:
+            with self.metrics.stage(func.__name__, dict(key[1]) if isinstance(key[1], tuple) else {}) as record:
+                self._stage_cache[key] = self.cached_result(key, lambda: func(self, *args, **kwargs))
+                record["rows_out"] = len(self._stage_cache[key])
+        self._latest_stage[func.__name__] = key
+        return self._stage_cache[key]
+    return inner
+
+
+def instrumented_stage(func):
+    """Record each call as a stage in self.metrics (rows in/out from DataFrame or report results)."""
+    signature = inspect.signature(func)
+    @functools.wraps(func)
+    def inner(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = {k: v for k, v in tuple(bound.arguments.items())[1:] if not isinstance(v, pd.DataFrame)}
+        with self.metrics.stage(func.__name__, params) as record:
+            result = func(self, *args, **kwargs)
+            if isinstance(result, pd.DataFrame):
+                record["rows_out"] = len(result)
+            elif isinstance(result, dict):
+                record.update({k: result[k] for k in ("rows_in", "rows_out") if k in result})
+            return result
+    return inner
+
+
+# ---------- hash-based row deduplication ----------
+
+DIGEST128 = np.dtype([("hi", "u8"), ("lo", "u8")])
+_HASH_KEY_2 = "Transform-digest"  # second 16-byte key for the low half of 128-bit digests
+
+
+def row_digests(df, bits=64):
+    """One 64-bit (uint64) or 128-bit (DIGEST128) digest per row, over all columns."""
+    hi = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    if bits == 64:
+        return hi
+    if bits != 128:
+        raise ValueError(f"digest bits must be 64 or 128, got {bits}")
+    out = np.empty(len(hi), dtype=DIGEST128)
+    out["hi"] = hi
+    out["lo"] = pd.util.hash_pandas_object(df, index=False, hash_key=_HASH_KEY_2).to_numpy(dtype=np.uint64)
+    return out
+
+
+def _contains(sorted_run, values):
+    pos = np.searchsorted(sorted_run, values)
+    pos[pos == len(sorted_run)] = 0
+    return (sorted_run[pos] == values) if len(sorted_run) else np.zeros(len(values), dtype=bool)
+
+
+class RowDigestSet:
+    """Set of row digests kept as sorted numpy runs, spilling to per-partition files when too large."""
+
+    def __init__(self, max_items=50_000_000, spill_dir=None, partitions=256):
+        self.max_items = max_items
+        self.spill_dir = spill_dir
+        self.partitions = partitions
+        self._runs = []
+        self._in_memory = 0
+        self._spilled = set()
+        self._owns_dir = False
+        self.size = 0
+
+    def _partition(self, digests):
+        hi = digests["hi"] if digests.dtype == DIGEST128 else digests
+        return (hi % np.uint64(self.partitions)).astype(np.int64)
+
+    def _partition_path(self, p):
+        return os.path.join(self.spill_dir, f"{p:04d}.npy")
+
+    def add_new(self, digests):
+        """Mask of digests not seen before (first occurrence within the batch); adds them to the set."""
+        if len(digests) == 0:
+            return np.zeros(0, dtype=bool)
+        _, first_idx = np.unique(digests, return_index=True)
+        new = np.zeros(len(digests), dtype=bool)
+        new[first_idx] = True
+        for run in self._runs:
+            new[new] &= ~_contains(run, digests[new])
+        if self._spilled and new.any():
+            cand = np.flatnonzero(new)
+            parts = self._partition(digests[cand])
+            for p in np.unique(parts):
+                if p in self._spilled:
+                    sel = cand[parts == p]
+                    new[sel] = ~_contains(np.load(self._partition_path(p), mmap_mode="r"), digests[sel])
+        fresh = np.sort(digests[new])
+        if len(fresh):
+            self._runs.append(fresh)
+            self._in_memory += len(fresh)
+            self.size += len(fresh)
+            if len(self._runs) > 8:
+                self._runs = [np.sort(np.concatenate(self._runs))]
+            if self._in_memory > self.max_items:
+                self._spill()
+        return new
+
+    def _spill(self):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix=".row_digests_")
+            self._owns_dir = True
+        allrun = np.concatenate(self._runs)
+        parts = self._partition(allrun)
+        for p in np.unique(parts):
+            chunk = allrun[parts == p]
+            path = self._partition_path(p)
+            if p in self._spilled:
+                chunk = np.concatenate([np.load(path), chunk])
+            np.save(path, np.sort(chunk))
+            self._spilled.add(int(p))
+        self._runs, self._in_memory = [], 0
+
+    def close(self):
+        if self._owns_dir and self.spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self._runs, self._spilled = [], set()
+
+
+def _rows_equal(df, left, right):
+    """Exact row equality (NaN == NaN) of df rows at positions left vs right."""
+    equal = np.ones(len(left), dtype=bool)
+    for column in df.columns:
+        a = df[column].iloc[left].reset_index(drop=True)
+        b = df[column].iloc[right].reset_index(drop=True)
+        equal &= (a == b).fillna(False).to_numpy(dtype=bool) | (a.isna() & b.isna()).to_numpy()
+    return equal
+
+
+def hash_dedup_mask(df, bits=64, verify=False):
+    """Mask keeping the first occurrence of each row, deduplicating on row digests.
+
+    With verify=True, the result matches drop_duplicates exactly: rows of a digest whose values
+    differ from its first row (hash collisions) are re-deduplicated with an exact duplicated().
+    """
+    digests = row_digests(df, bits)
+    _, first_idx, inverse = np.unique(digests, return_index=True, return_inverse=True)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[first_idx] = True
+    if verify:
+        groups = inverse.reshape(-1)
+        dups = np.flatnonzero(~keep)
+        differs = ~_rows_equal(df, dups, first_idx[groups[dups]])
+        if differs.any():
+            rows = np.flatnonzero(np.isin(groups, groups[dups[differs]]))  # every row of a colliding digest
+            keep[rows] = ~df.iloc[rows].duplicated().to_numpy()
+    return keep
+
+
+# ---------- min-max scaling on contiguous blocks ----------
+
+def _float_block(data, columns, dtype="float64"):
+    """The given columns copied once into a writable column-major float block."""
+    block = np.empty((len(data), len(columns)), dtype=dtype, order="F")
+    for j, column in enumerate(columns):
+        block[:, j] = data[column].to_numpy(dtype="float64", na_value=np.nan)
+    return block
+
+
+def _minmax_scale_block(block):
+    """Min-max scale every column of block in place; returns (min, max) per column."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        mins = np.nanmin(block, axis=0) if len(block) else np.full(block.shape[1], np.nan, dtype=block.dtype)
+        maxs = np.nanmax(block, axis=0) if len(block) else np.full(block.shape[1], np.nan, dtype=block.dtype)
+    span = maxs - mins
+    np.subtract(block, mins, out=block)
+    # after the subtraction a constant column is already all zeros; leave it as is
+    np.divide(block, span, out=block, where=span != 0)
+    return mins, maxs
+
+
+def _frame_with_block(data, columns, block):
+    """data with the given columns replaced by block's columns (viewed, not copied)."""
+    scaled = dict(zip(columns, block.T))  # each column is a contiguous view into the block
+    return pd.DataFrame({column: scaled[column] if column in scaled else data[column]
+                         for column in data.columns}, index=data.index, copy=False)
+
+
+# ---------- null handling ----------
+
+def _null_masks(df, columns):
+    """Column -> boolean null mask, for the columns that have nulls (one isna pass per column array)."""
+    masks = {}
+    for column in columns:
+        mask = pd.isna(df[column].array)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            masks[column] = mask
+    return masks
+
+
+def _fill_statistic(series, rows, how):
+    """Median (numeric columns) or mode of series over the rows mask."""
+    values = series[rows]
+    if how == "median" and pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return values.median()
+    modes = values.mode()
+    return modes.iloc[0] if len(modes) else None
+
+
+def _is_fractional(value):
+    return isinstance(value, (float, np.floating)) and not float(value).is_integer()
+
+
+def _take_filled(df, rows, fills, null_masks):
+    """df rows at positions rows (fresh RangeIndex) with fills applied: one new array per column."""
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        fill = fills.get(column)
+        if fill is not None and isinstance(series.dtype, np.dtype) and series.dtype.kind in "fc":
+            values = series.to_numpy().take(rows)  # a fresh array, filled in place
+            values[null_masks[column].take(rows)] = fill
+        else:
+            values = series.array.take(rows)
+            if fill is not None:
+                if pd.api.types.is_integer_dtype(series.dtype) and _is_fractional(fill):
+                    values = values.astype("Float64")  # e.g. a median of 3.5 in an Int64 column
+                values = pd.Series(values).fillna(fill).array
+        columns[column] = values
+    return pd.DataFrame(columns, columns=df.columns, copy=False)
+
+
+# ---------- fitted statistics ----------
+
+class TransformStats:
+    """Frozen IQR bounds and post-filter min/max per numeric column; fit once, apply to any batch."""
+
+    def __init__(self, columns, lower, upper, min_val, max_val):
+        self.columns = list(columns)
+        self.lower = np.asarray(lower, dtype="float64")
+        self.upper = np.asarray(upper, dtype="float64")
+        self.min = np.asarray(min_val, dtype="float64")
+        self.max = np.asarray(max_val, dtype="float64")
+        span = self.max - self.min
+        # constant columns scale to 0 instead of dividing by zero
+        self._scale = np.divide(1.0, span, out=np.zeros_like(span), where=span != 0)
+
+    def transform_array(self, values, filter_outliers=True):
+        """(keep mask, scaled rows) for a float array whose columns follow self.columns."""
+        values = np.asarray(values, dtype="float64")
+        if filter_outliers:
+            keep = ((values >= self.lower) & (values <= self.upper)).all(axis=1)
+            values = values[keep]
+        else:
+            keep = np.ones(len(values), dtype=bool)
+        return keep, (values - self.min) * self._scale
+
+    def apply(self, data, filter_outliers=True):
+        """Filter rows outside the fitted bounds and min-max scale with the fitted min/max.
+
+        A 2-D float array (columns in self.columns order) returns the scaled kept rows as an
+        array, in microseconds for request-sized batches. A DataFrame returns a new DataFrame;
+        pandas' per-column overhead puts that at a few hundred microseconds whatever the size.
+        """
+        if isinstance(data, np.ndarray):
+            return self.transform_array(data, filter_outliers)[1]
+        keep, scaled = self.transform_array(_float_block(data, self.columns), filter_outliers)
+        rows = np.flatnonzero(keep)
+        position = {column: j for j, column in enumerate(self.columns)}
+        columns = {column: scaled[:, position[column]] if column in position else data[column].array.take(rows)
+                   for column in data.columns}
+        return pd.DataFrame(columns, columns=data.columns, index=data.index.take(rows), copy=False)
+
+    def to_dict(self):
+        return {"columns": self.columns, "lower": self.lower.tolist(), "upper": self.upper.tolist(),
+                "min": self.min.tolist(), "max": self.max.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["columns"], d["lower"], d["upper"], d["min"], d["max"])
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# ---------- partition workers (module level so process pools can pickle them) ----------
+
+def _summarize_partition(values, k):
+    """NumericSummary dict per column of a float block."""
+    summaries = []
+    for j in range(values.shape[1]):
+        summary = NumericSummary(k=k)
+        summary.update(values[:, j])
+        summaries.append(summary.to_dict())
+    return summaries
+
+
+def _filter_partition(values, lower, upper):
+    """Per-column min/max of the rows inside every bound (+inf/-inf when none are)."""
+    kept = values[((values >= lower) & (values <= upper)).all(axis=1)]
+    if len(kept) == 0:
+        return np.full(values.shape[1], np.inf), np.full(values.shape[1], -np.inf)
+    return kept.min(axis=0), kept.max(axis=0)
+
+
+# ---------- instrumentation ----------
+
+_log = logging.getLogger("Transform")
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes (None where the platform has no getrusage)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMetrics:
+    """Per-stage wall time, rows in/out and peak-memory growth, plus per-column times for columnwise loops.
+
+    Cheap enough to leave on: one perf_counter and one getrusage call per stage and column.
+    Nested stages (normalization runs outlier_treatment, which runs data_cleaning) are recorded
+    with their depth; seconds are inclusive. peak_rss_delta is how much the process peak RSS
+    grew during the stage (0 when the stage stayed below an earlier peak). Each finished stage is
+    also logged as an INFO record on the "Transform" logger with the record under extra["stage"].
+    Only the latest max_records records are kept; totals holds the call count and inclusive
+    seconds per stage over the instance's lifetime.
+    """
+
+    def __init__(self, enabled=True, max_records=1000):
+        self.enabled = enabled
+        self.records = collections.deque(maxlen=max_records)
+        self.totals = {}
+        self._stack = []
+
+    @contextlib.contextmanager
+    def stage(self, name, params=None):
+        if not self.enabled:
+            yield {}
+            return
+        record = {"stage": name, "params": params or {}, "depth": len(self._stack), "seconds": None,
+                  "rows_in": None, "rows_out": None, "peak_rss_delta": None, "columns": {}, "messages": []}
+        rss = _peak_rss()
+        started = time.perf_counter()
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            self._stack.pop()
+            record["seconds"] = round(time.perf_counter() - started, 6)
+            if rss is not None:
+                record["peak_rss_delta"] = _peak_rss() - rss
+            self.records.append(record)
+            total = self.totals.setdefault(name, {"calls": 0, "seconds": 0.0})
+            total["calls"] += 1
+            total["seconds"] = round(total["seconds"] + record["seconds"], 6)
+            if _log.isEnabledFor(logging.INFO):
+                _log.info("%s: %.6f s, rows %s -> %s", name, record["seconds"], record["rows_in"],
+                          record["rows_out"], extra={"stage": record})
+
+    @contextlib.contextmanager
+    def column(self, column):
+        """Add the time spent in the block to the current stage's per-column seconds."""
+        if not self.enabled or not self._stack:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            columns = self._stack[-1]["columns"]
+            columns[str(column)] = round(columns.get(str(column), 0.0) + time.perf_counter() - started, 6)
+
+    def note(self, **fields):
+        """Set fields (rows_in, cache, ...) on the innermost running stage."""
+        if self.enabled and self._stack:
+            self._stack[-1].update(fields)
+
+    def message(self, text):
+        if self.enabled and self._stack:
+            self._stack[-1]["messages"].append(text)
+
+    def reset(self):
+        self.records.clear()
+        self.totals = {}
+
+    def to_dict(self):
+        return {"stages": list(self.records), "totals": self.totals,
+                "seconds": round(sum(r["seconds"] for r in self.records if r["depth"] == 0), 6)}
+
+    def to_json(self, path=None):
+        """The records as JSON; written atomically to path when given."""
+        text = json.dumps(self.to_dict(), indent=2, default=str)
+        if path is not None:
+            path = Path(path)
+            tmp = path.with_name(f".{path.name}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        return text
+
+
+# ---------- lazy query plans ----------
+
+_PREDICATES = {
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge, "in": lambda series, values: series.isin(values),
+}
+_PIPELINE_ORDER = ("clean", "clip_outliers", "normalize")
+
+
+class TransformPlan:
+    """Transform steps recorded lazily and executed once by collect().
+
+    Start one from Transform.select/where/clean/clip_outliers/normalize; every step returns a
+    new plan. Before running, the plan is optimized: the columns any step needs are pushed into
+    the Extract read, deduplication, null and where() filters and the IQR bounds are combined
+    into one row mask applied with a single take (where() steps before clean() are evaluated
+    first and deduplication only considers the rows passing them), quartiles for all columns come from one call
+    and min/max is computed on the block that is then scaled in place.
+    """
+
+    def __init__(self, transform, steps=()):
+        self.transform = transform
+        self.steps = tuple(steps)
+
+    def _then(self, step, **params):
+        done = [name for name, _ in self.steps if name in _PIPELINE_ORDER]
+        if "normalize" in done:
+            raise ValueError("normalize() must be the last step of a plan")
+        if step in done:
+            raise ValueError(f"{step}() is already in the plan")
+        if step in _PIPELINE_ORDER and done and _PIPELINE_ORDER.index(done[-1]) > _PIPELINE_ORDER.index(step):
+            raise ValueError(f"{step}() must come before {done[-1]}()")
+        return TransformPlan(self.transform, self.steps + ((step, params),))
+
+    def select(self, columns):
+        return self._then("select", columns=list(columns))
+
+    def where(self, column, op, value):
+        if op not in _PREDICATES:
+            raise ValueError(f"Unknown predicate {op!r}; expected one of {sorted(_PREDICATES)}")
+        return self._then("where", column=column, op=op, value=value)
+
+    def clean(self, dedup="pandas", digest_bits=64, verify=False):
+        if dedup not in {"pandas", "hash"}:
+            raise ValueError(f"Unknown dedup strategy: {dedup!r}")
+        return self._then("clean", dedup=dedup, digest_bits=digest_bits, verify=verify)
+
+    def clip_outliers(self):
+        return self._then("clip_outliers")
+
+    def normalize(self, dtype="float64"):
+        if np.dtype(dtype).kind != "f":
+            raise ValueError(f"Normalization dtype must be a float type, got {dtype}")
+        return self._then("normalize", dtype=dtype)
+
+    # ---------- optimizer ----------
+
+    def optimize(self):
+        """The physical plan: pushed-down read columns, combined filters and fused statistics."""
+        visible = None  # None = every column of the source
+        needed = []
+        plan = {"read_columns": None, "scan_filters": [], "clean": None, "clean_columns": None, "pre_filters": [],
+                "clip": False, "clip_columns": None, "post_filters": [], "normalize": None,
+                "normalize_columns": None, "output_columns": None}
+
+        def need(columns):
+            if columns is None:
+                needed.append(None)
+            else:
+                needed.extend(c for c in columns if c not in needed)
+
+        for op, params in self.steps:
+            if op == "select":
+                missing = [c for c in params["columns"] if visible is not None and c not in visible]
+                if missing:
+                    raise KeyError(f"select() of columns not available at that step: {missing}")
+                visible = params["columns"]
+            elif op == "where":
+                if visible is not None and params["column"] not in visible:
+                    raise KeyError(f"where() on a column not available at that step: {params['column']!r}")
+                need([params["column"]])
+                if plan["clip"]:
+                    filters = plan["post_filters"]
+                else:  # before clean() they decide which rows are deduplicated, so they run first
+                    filters = plan["pre_filters"] if plan["clean"] else plan["scan_filters"]
+                filters.append((params["column"], params["op"], params["value"]))
+            elif op == "clean":
+                plan["clean"], plan["clean_columns"] = params, visible
+                need(visible)
+            elif op == "clip_outliers":
+                plan["clip"], plan["clip_columns"] = True, visible
+                need(visible)
+            elif op == "normalize":
+                plan["normalize"], plan["normalize_columns"] = params, visible
+                need(visible)
+        plan["output_columns"] = visible
+        need(visible)
+        if None not in needed:
+            plan["read_columns"] = needed
+        return plan
+
+    def explain(self):
+        """Human-readable optimized plan."""
+        plan = self.optimize()
+        scope = lambda columns: "all columns" if columns is None else f"{columns}"
+        lines = [f"Scan {self.transform.source} -> {scope(plan['read_columns'])}"]
+        mask = [f"{c} {op} {v!r}" for c, op, v in plan["scan_filters"]]
+        if plan["clean"]:
+            among = f" of rows passing ({' & '.join(mask)})" if mask else ""
+            mask.append(f"dedup[{plan['clean']['dedup']}]{among} & not-null over {scope(plan['clean_columns'])}")
+        mask += [f"{c} {op} {v!r}" for c, op, v in plan["pre_filters"]]
+        if plan["clip"]:
+            lines.append(f"Stats: IQR quartiles of numeric {scope(plan['clip_columns'])} on rows passing "
+                         f"({' & '.join(mask) or 'all rows'}), one pass")
+            mask.append("inside IQR bounds")
+        mask += [f"{c} {op} {v!r}" for c, op, v in plan["post_filters"]]
+        if mask:
+            lines.append(f"Filter (one mask, one take): {' & '.join(mask)}")
+        lines.append(f"Project: {scope(plan['output_columns'])}")
+        if plan["normalize"]:
+            lines.append(f"Normalize: min/max and in-place scaling of numeric {scope(plan['normalize_columns'])} "
+                         f"as one {plan['normalize']['dtype']} block")
+        return "\n".join(lines)
+
+    # ---------- execution ----------
+
+    def collect(self, engine="auto", chunksize=100_000, streaming_threshold=512 * 2**20, kll_k=200,
+                encoding="utf-8"):
+        """Execute the plan once and return the resulting DataFrame (index reset).
+
+        engine="memory" loads the projected source (or uses an already loaded df); "streaming"
+        reads projected chunks twice (quartiles from KLL sketches, deduplication by row digest
+        across chunks) and only keeps surviving rows; "auto" streams sources larger than
+        streaming_threshold bytes. Once self.df has been replaced the plan runs on it in memory.
+        """
+        plan = self.optimize()
+        from_source = self.transform._df_from_source
+        if engine == "auto":
+            large = from_source and os.path.getsize(self.transform.source) > streaming_threshold
+            engine = "streaming" if large else "memory"
+        if engine not in {"memory", "streaming"}:
+            raise ValueError(f"Unknown plan engine: {engine!r}")
+        if engine == "streaming" and not from_source:
+            raise ValueError('engine="streaming" reads the source file; self.df has been replaced, use "memory"')
+        chain = ("plan", self.steps, engine) + ((chunksize, kll_k) if engine == "streaming" else ())
+        with self.transform.metrics.stage("collect", {"steps": self.steps, "engine": engine}) as record:
+            result = self.transform.cached_result(
+                chain, lambda: self._execute(plan, engine, chunksize, kll_k, encoding))
+            record["rows_out"] = len(result)
+        return result
+
+    def _execute(self, plan, engine, chunksize, kll_k, encoding):
+        if engine == "memory":
+            result, rows_in = self._collect_memory(plan, encoding)
+        else:
+            result, rows_in = self._collect_streaming(plan, chunksize, kll_k, encoding)
+        self.transform.metrics.note(rows_in=rows_in)
+        if plan["normalize"]:
+            columns = _numeric(result, plan["normalize_columns"])
+            block = _float_block(result, columns, plan["normalize"]["dtype"])
+            _minmax_scale_block(block)
+            result = _frame_with_block(result, columns, block)
+        self.transform._say(f"Plan collected ({engine}): {rows_in} rows read, {len(result)} rows out.")
+        return result
+
+    def _pre_mask(self, frame, plan, seen=None):
+        """Dedup/null/where mask of the steps before clip_outliers.
+
+        where() filters preceding clean() are applied first and only the rows passing them are
+        deduplicated; the null filter and later where() filters commute and are ANDed in.
+        """
+        mask = _where_mask(frame, plan["scan_filters"])
+        if plan["clean"]:
+            data = frame if plan["clean_columns"] is None else frame[plan["clean_columns"]]
+            rows = None if mask.all() else np.flatnonzero(mask)
+            candidates = data if rows is None else data.iloc[rows]
+            clean = plan["clean"]
+            if seen is not None:
+                first = seen.add_new(row_digests(candidates, clean["digest_bits"]))
+            elif clean["dedup"] == "hash":
+                first = hash_dedup_mask(candidates, clean["digest_bits"], clean["verify"])
+            else:
+                first = ~candidates.duplicated().to_numpy()
+            if rows is None:
+                mask &= first
+            else:
+                mask[rows] = first
+            mask &= data.notna().all(axis=1).to_numpy()
+        return mask & _where_mask(frame, plan["pre_filters"])
+
+    def _inside(self, frame, plan, bounds):
+        if not plan["clip"] or not len(bounds[0]):
+            return np.ones(len(frame), dtype=bool)
+        values = _float_block(frame, _numeric(frame, plan["clip_columns"]))
+        return ((values >= bounds[0]) & (values <= bounds[1])).all(axis=1)
+
+    def _take(self, frame, plan, mask):
+        columns = plan["output_columns"] if plan["output_columns"] is not None else frame.columns
+        return frame.loc[mask, columns]
+
+    def _collect_memory(self, plan, encoding):
+        transform = self.transform
+        if transform._df is not None:
+            frame = transform._df if plan["read_columns"] is None else transform._df[plan["read_columns"]]
+        else:
+            frames = list(transform.iter_frames(encoding, columns=plan["read_columns"]))
+            frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        mask = self._pre_mask(frame, plan)
+        bounds = ([], [])
+        if plan["clip"]:
+            values = _float_block(frame, _numeric(frame, plan["clip_columns"]))
+            if values.shape[1]:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", RuntimeWarning)  # no rows left
+                    Q1, Q3 = np.nanquantile(values[mask], [0.25, 0.75], axis=0)
+                IQR = Q3 - Q1
+                bounds = (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+                mask &= ((values >= bounds[0]) & (values <= bounds[1])).all(axis=1)
+            del values
+        mask &= _where_mask(frame, plan["post_filters"])
+        return self._take(frame, plan, mask).reset_index(drop=True), len(frame)
+
+    def _collect_streaming(self, plan, chunksize, kll_k, encoding):
+        transform = self.transform
+        bits = plan["clean"]["digest_bits"] if plan["clean"] else 64
+
+        def masked():
+            seen = RowDigestSet(max_items=transform.max_digests_in_memory) if plan["clean"] else None
+            try:
+                for chunk in transform.iter_frames(encoding, chunksize, columns=plan["read_columns"]):
+                    yield chunk, self._pre_mask(chunk, plan, seen)
+            finally:
+                if seen is not None:
+                    seen.close()
+
+        bounds = ([], [])
+        if plan["clip"]:
+            sketches = None
+            for chunk, mask in masked():
+                columns = _numeric(chunk, plan["clip_columns"])
+                values = _float_block(chunk, columns)[mask]
+                if sketches is None:
+                    sketches = [KLLSketch(k=kll_k) for _ in columns]
+                for j, sketch in enumerate(sketches):
+                    sketch.update(values[:, j])
+            if sketches:
+                quartiles = np.array([s.quantiles([0.25, 0.75]) for s in sketches], dtype="float64")
+                IQR = quartiles[:, 1] - quartiles[:, 0]
+                bounds = (quartiles[:, 0] - 1.5 * IQR, quartiles[:, 1] + 1.5 * IQR)
+        parts, rows_in = [], 0
+        for chunk, mask in masked():
+            rows_in += len(chunk)
+            mask &= self._inside(chunk, plan, bounds) & _where_mask(chunk, plan["post_filters"])
+            parts.append(self._take(chunk, plan, mask))
+        result = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=plan["output_columns"])
+        return result, rows_in
+
+
+def _numeric(frame, columns):
+    """Numeric columns of frame, restricted to columns when given (frame order)."""
+    numeric = frame.select_dtypes(include=["number"]).columns
+    return [c for c in numeric if columns is None or c in columns]
+
+
+def _where_mask(frame, filters):
+    mask = np.ones(len(frame), dtype=bool)
+    for column, op, value in filters:
+        mask &= _PREDICATES[op](frame[column], value).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
 class Transform(Extract):
-    def __init__(self, source, destination):
-        super().__init__(source, destination)
-        self.df = self.convert()
-
-    def data_cleaning(self):
-        shape1 = self.df.shape[0]
-        data=self.df.drop_duplicates()
-        data=data.dropna()
-        data.reset_index(drop=True, inplace=True)
+    def __init__(self, source, destination, digest_bits=64, max_digests_in_memory=50_000_000,
+                 result_cache=None, cache_bytes=DEFAULT_CACHE_BYTES, full_hash=False, verbose=True,
+                 instrument=True, cleaning=None, backend="auto", **options):
+        super().__init__(source, destination, **options)
+        if backend == "auto":
+            native = self.source.suffix.lower() in arrow_backend.NATIVE_FORMATS
+            backend = "arrow" if arrow_backend.pa is not None and native else "pandas"
+        if backend not in {"pandas", "arrow"}:
+            raise ValueError(f"Unknown backend: {backend!r}")
+        if backend == "arrow" and arrow_backend.pa is None:
+            raise RuntimeError("The arrow backend requires pyarrow; install pyarrow to use it.")
+        self.backend = backend
+        self._table = None
+        self.cleaning = dict(cleaning or {})  # data_cleaning() options used by the downstream stages
+        self.verbose = verbose
+        self.metrics = StageMetrics(enabled=instrument)
+        self._df = None
+        self._df_from_source = True
+        self._stage_cache = {}
+        self.digest_bits = digest_bits
+        self.max_digests_in_memory = max_digests_in_memory
+        self._latest_stage = {}  # stage name -> key of its most recent call
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            result_cache = ResultCache(result_cache, cache_bytes)
+        self.result_cache = result_cache
+        self.full_hash = full_hash
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._df = self.load()
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        self._df = value
+        self._df_from_source = False  # results no longer follow from the source file
+        self.invalidate()
+
+    @property
+    def table(self):
+        """The source as a pyarrow Table (read natively for Parquet/Feather/ORC, else from self.df)."""
+        if self._table is None:
+            if self.source.suffix.lower() in arrow_backend.NATIVE_FORMATS:
+                self._table = arrow_backend.read_table(self.source)
+            else:
+                self._table = arrow_backend.pa.Table.from_pandas(self.df, preserve_index=False)
+        return self._table
+
+    def _use_arrow(self, dedup=None):
+        """Whether a stage runs on the Arrow backend: only with the default (exact) dedup, whose
+        semantics the Arrow group_by reproduces; dedup defaults to the one in self.cleaning."""
+        dedup = self.cleaning.get("dedup", "pandas") if dedup is None else dedup
+        return self.backend == "arrow" and self._df_from_source and dedup == "pandas"
+
+    def load(self, encoding="utf-8"):
+        frames = list(self.iter_frames(encoding))
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def invalidate(self):
+        """Drop cached stage results (call after mutating self.df in place).
+
+        A loaded self.df no longer matches the source afterwards, so the result cache is bypassed.
+        """
+        self._stage_cache.clear()
+        if self._df is not None:
+            self._df_from_source = False
+
+    @property
+    def bounds_report(self):
+        """Report of the latest outlier_treatment() call when its engine was "approximate", else None."""
+        result = self._stage_cache.get(self._latest_stage.get("outlier_treatment"))
+        return None if result is None else result.attrs.get("bounds_report")
+
+    def _say(self, text):
+        """Progress message: printed when verbose, always kept on the running stage's metrics record."""
+        self.metrics.message(text)
+        if self.verbose:
+            print(text)
+
+    # ---------- on-disk result cache ----------
+
+    def _reader_options(self):
+        """Options (and schema files) that change how the source parses."""
+        schema_files = [Path(self.schema)] if self.schema and self.schema != "infer" else []
+        schema_files.append(schema_sidecar(self.source))
+        return {"schema": self.schema, "schema_sample": self.schema_sample, "sheets": self.sheets,
+                "tables": sorted(self.tables) if self.tables else None,
+                "table_id": self.table_id.pattern if self.table_id else None,
+                "schema_files": [source_fingerprint(p) for p in schema_files if p.exists()]}
+
+    def cached_result(self, chain, compute):
+        """compute() through the result cache, keyed by source fingerprint, stage chain and reader options.
+
+        Bypassed without a cache or once self.df has been replaced or invalidated. Hits are
+        returned as writable copies.
+        """
+        if self.result_cache is None or not self._df_from_source:
+            return compute()
+        key = cache_key(source=source_fingerprint(self.source, self.full_hash), reader=self._reader_options(),
+                        cleaning=self.cleaning, backend=self.backend, chain=chain)
+        result = self.result_cache.get(key)
+        self.metrics.note(cache="hit" if result is not None else "miss")
+        if result is not None:
+            return result.copy()  # hits are read-only memory-mapped views; stage results are writable
+        result = compute()
+        try:
+            self.result_cache.put(key, result)
+        except UncacheableResult as e:
+            self.metrics.note(cache="uncacheable")
+            self._say(f"Warning: result not cached ({e}).")
+        return result
+
+    def cache_stats(self):
+        """Result cache statistics (hit rate, entries, bytes), or None without a cache."""
+        return self.result_cache.stats() if self.result_cache is not None else None
+
+    # ---------- Arrow backend (see arrow_backend) ----------
+
+    def _arrow_stage(self, name, params, compute):
+        key = ("arrow", name, repr(params))
+        if key not in self._stage_cache:
+            with self.metrics.stage(name, params) as record:
+                self._stage_cache[key] = compute()
+                record["rows_out"] = self._stage_cache[key].num_rows
+        return self._stage_cache[key]
+
+    def clean_arrow(self, dedup="pandas", digest_bits=64, verify=False, nulls="drop", subset=None, thresh=None,
+                    fill_value=None):
+        """data_cleaning on self.table with Arrow kernels; dedup is always exact (digest options are ignored)."""
+        if dedup not in {"pandas", "hash"}:
+            raise ValueError(f"Unknown dedup strategy: {dedup!r}")
+        def compute():
+            self.metrics.note(rows_in=self.table.num_rows)
+            table, fills = arrow_backend.clean(self.table, nulls, subset, thresh, fill_value)
+            if nulls in {"median", "mode", "constant"}:
+                self._say(f"Nulls filled ({nulls}) in {len(fills)} columns.")
+            return table
+        params = {"nulls": nulls, "subset": subset, "thresh": thresh, "fill_value": fill_value}
+        return self._arrow_stage("clean_arrow", params, compute)
+
+    def outliers_arrow(self):
+        """Vectorized IQR filter of the cleaned Table."""
+        def compute():
+            table = self.clean_arrow(**self.cleaning)
+            self.metrics.note(rows_in=table.num_rows)
+            result, bounds = arrow_backend.iqr_filter(table)
+            if table.num_rows:
+                self._say(f"Outlier treatment on {len(bounds)} columns: "
+                          f"{(table.num_rows - result.num_rows)*100/table.num_rows} % rows removed.")
+            return result
+        return self._arrow_stage("outliers_arrow", {}, compute)
+
+    def normalize_arrow(self, dtype="float64"):
+        """Min-max scaled numeric columns of the outlier-filtered Table."""
+        def compute():
+            table = self.outliers_arrow()
+            self.metrics.note(rows_in=table.num_rows)
+            result = arrow_backend.minmax(table, dtype=dtype)
+            self._say("Normalization completed using Min-Max scaling.")
+            return result
+        return self._arrow_stage("normalize_arrow", {"dtype": dtype}, compute)
+
+    @instrumented_stage
+    def write(self, out_path, stage="normalization", encoding="utf-8"):
+        """Write a stage result to out_path (.csv, .parquet or .feather).
+
+        The arrow backend writes its Table directly (no pandas round trip) unless a non-UTF-8 CSV
+        is requested.
+        """
+        stages = {"data_cleaning": lambda: self.clean_arrow(**self.cleaning),
+                  "outlier_treatment": self.outliers_arrow, "normalization": self.normalize_arrow}
+        if stage not in stages:
+            raise ValueError(f"Unknown stage: {stage!r}")
+        out_path = Path(out_path)
+        native_out = out_path.suffix.lower() in {".parquet", ".feather"}
+        if self._use_arrow() and (native_out or encoding.lower().replace("-", "") == "utf8"):
+            table = stages[stage]()
+            arrow_backend.write_table(table, out_path)
+            return {"path": str(out_path), "backend": "arrow", "rows_out": table.num_rows}
+        data = self.data_cleaning(**self.cleaning) if stage == "data_cleaning" else getattr(self, stage)()
+        if native_out:
+            arrow_backend.write_table(arrow_backend.pa.Table.from_pandas(data, preserve_index=False), out_path)
+        else:
+            with self.open_csv(out_path, encoding=encoding) as sink:
+                sink.write(data)
+        return {"path": str(out_path), "backend": "pandas", "rows_out": len(data)}
+
+    # ---------- lazy plans (see TransformPlan) ----------
+
+    def select(self, columns):
+        return TransformPlan(self).select(columns)
+
+    def where(self, column, op, value):
+        return TransformPlan(self).where(column, op, value)
+
+    def clean(self, dedup="pandas", digest_bits=64, verify=False):
+        return TransformPlan(self).clean(dedup, digest_bits, verify)
+
+    def clip_outliers(self):
+        return TransformPlan(self).clip_outliers()
+
+    def normalize(self, dtype="float64"):
+        return TransformPlan(self).normalize(dtype)
+
+    @memoized_stage
+    def data_cleaning(self, dedup="pandas", digest_bits=64, verify=False, nulls="drop", subset=None, thresh=None,
+                      fill_value=None):
+        """Drop duplicate rows, then handle nulls in the subset columns (default: all).
+
+        dedup="hash" dedups on one 64/128-bit digest per row instead of drop_duplicates (far less
+        intermediate memory on wide frames); verify=True re-checks digest matches exactly.
+
+        nulls="drop" drops rows with a null in subset (with thresh: rows with fewer than thresh
+        non-null subset values); "median" / "mode" / "constant" fill subset nulls with each
+        column's median (mode for non-numeric columns) / mode / fill_value, computed once on the
+        deduplicated rows; "keep" leaves nulls alone. Nulls are found in one pass over the column
+        arrays and the result is built with one take per column.
+        """
+        if self._use_arrow(dedup):
+            shape1 = self.table.num_rows
+            data = self.clean_arrow(dedup, digest_bits, verify, nulls, subset, thresh, fill_value).to_pandas()
+        else:
+            shape1 = self.df.shape[0]
+            data = self._clean_pandas(self.df, dedup, digest_bits, verify, nulls, subset, thresh, fill_value)
+        self.metrics.note(rows_in=shape1)
         shape2 = data.shape[0]
         if (shape1 - shape2)/shape1 > 0.1:
-            print(f"Warning: {(shape1 - shape2)*100/shape1} % of the data was removed during cleaning.")
-        print(f"Data cleaned: {(shape1 - shape2)*100/shape1} % rows removed.")
+            self._say(f"Warning: {(shape1 - shape2)*100/shape1} % of the data was removed during cleaning.")
+        self._say(f"Data cleaned: {(shape1 - shape2)*100/shape1} % rows removed.")
         return data
-    def outlier_treatment(self):
-        data=self.data_cleaning()
+    def _clean_pandas(self, df, dedup="pandas", digest_bits=64, verify=False, nulls="drop", subset=None, thresh=None,
+                      fill_value=None):
+        if dedup == "hash":
+            keep = hash_dedup_mask(df, digest_bits, verify)
+        elif dedup == "pandas":
+            keep = ~df.duplicated().to_numpy()
+        else:
+            raise ValueError(f"Unknown dedup strategy: {dedup!r}")
+        subset = list(df.columns) if subset is None else list(subset)
+        null_masks, fills = _null_masks(df, subset), {}
+        if nulls == "drop":
+            if null_masks:
+                null_count = np.zeros(len(df), dtype=np.int32)
+                for mask in null_masks.values():
+                    null_count += mask
+                keep &= (len(subset) - null_count >= thresh) if thresh is not None else (null_count == 0)
+        elif nulls in {"median", "mode", "constant"}:
+            if nulls == "constant" and fill_value is None:
+                raise ValueError('nulls="constant" needs a fill_value')
+            for column, mask in null_masks.items():
+                fills[column] = fill_value if nulls == "constant" else _fill_statistic(df[column], keep & ~mask, nulls)
+            self._say(f"Nulls filled ({nulls}) in {len(fills)} columns.")
+        elif nulls != "keep":
+            raise ValueError(f"Unknown null strategy: {nulls!r}")
+        return _take_filled(df, np.flatnonzero(keep), fills, null_masks)
+    @memoized_stage
+    def outlier_treatment(self, engine="vectorized", approx="sample", sample_size=100_000, kll_k=200,
+                          confidence=0.99, seed=0):
+        """IQR filter on every numeric column.
+
+        engine="vectorized" computes all quartiles in one call on the cleaned data and keeps rows
+        inside every column's bounds (one mask, one copy); engine="sequential" filters column by
+        column, each column's quartiles taken on the already filtered rows; engine="approximate"
+        is "vectorized" with quartiles estimated by approximate_bounds (the approx* arguments),
+        whose report is kept with the result and exposed as self.bounds_report.
+        """
+        if engine == "vectorized" and self._use_arrow():
+            return self.outliers_arrow().to_pandas()
+        data=self.data_cleaning(**self.cleaning)
+        self.metrics.note(rows_in=len(data))
         numeric_columns = data.select_dtypes(include=['number']).columns
-        for column in numeric_columns:
-            data = self._treat_outliers_iqr(data, column)
+        if engine == "sequential":
+            for column in numeric_columns:
+                with self.metrics.column(column):
+                    data = self._treat_outliers_iqr(data, column)
+            return data
+        if engine == "approximate":
+            report = self.approximate_bounds(data, approx, sample_size, kll_k, confidence, seed)
+            bounds = [np.array([report["columns"][c][side] for c in numeric_columns], dtype="float64")
+                      for side in ("lower", "upper")]
+            shown = {c: (round(b["lower"], 6), round(b["upper"], 6)) for c, b in report["columns"].items()}
+            self._say(f"Approximate IQR bounds ({approx}, {report['sample_rows']} of {report['rows']} rows, rank error "
+                      f"±{report['rank_error']:.4f} at {report['confidence']:.0%} confidence): {shown}")
+            result = self._treat_outliers_iqr_vectorized(data, numeric_columns, bounds).copy(deep=False)
+            result.attrs["bounds_report"] = report  # kept with the result through the memo and the result cache
+            return result
+        if engine != "vectorized":
+            raise ValueError(f"Unknown outlier engine: {engine!r}")
+        return self._treat_outliers_iqr_vectorized(data, numeric_columns)
+    def approximate_bounds(self, data=None, method="sample", sample_size=100_000, kll_k=200, confidence=0.99,
+                           seed=0):
+        """Approximate IQR bounds per numeric column of data (default: the cleaned data).
+
+        method="sample" takes the quartiles of a uniform sample of sample_size rows; by the DKW
+        inequality their rank error is at most sqrt(ln(2 / (1 - confidence)) / (2 * sample_size))
+        with the given confidence. method="sketch" feeds every value through a KLL sketch (rank
+        error from the sketch, 99% confidence). Each column reports its quartiles and bounds
+        plus lower_range/upper_range: the interval that holds the exact bound when the
+        quartiles are off by at most the rank error.
+        """
+        data = self.data_cleaning(**self.cleaning) if data is None else data
+        columns = list(data.select_dtypes(include=['number']).columns)
+        rows = len(data)
+        rng = np.random.default_rng(seed)
+        if method == "sample":
+            sample_rows = min(sample_size, rows)
+            if sample_rows < rows:
+                picked = rng.choice(rows, size=sample_rows, replace=False, shuffle=False)
+                values = _float_block(data[columns].iloc[picked], columns)
+                rank_error = math.sqrt(math.log(2 / (1 - confidence)) / (2 * sample_rows))
+            else:
+                values = _float_block(data, columns)
+                rank_error = 0.0
+            qs = np.clip([0.25 - rank_error, 0.25, 0.25 + rank_error, 0.75 - rank_error, 0.75, 0.75 + rank_error], 0, 1)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # empty / all-NaN columns
+                estimates = np.nanquantile(values, qs, axis=0) if len(values) else np.full((6, len(columns)), np.nan)
+        elif method == "sketch":
+            sample_rows = rows
+            estimates = np.full((6, len(columns)), np.nan)
+            rank_error = KLLSketch(k=kll_k).rank_error()
+            qs = np.clip([0.25 - rank_error, 0.25, 0.25 + rank_error, 0.75 - rank_error, 0.75, 0.75 + rank_error], 0, 1)
+            for j, column in enumerate(columns):
+                with self.metrics.column(column):
+                    sketch = KLLSketch(k=kll_k, seed=seed)
+                    sketch.update(data[column].to_numpy(dtype="float64", na_value=np.nan))
+                    if sketch.n:
+                        estimates[:, j] = sketch.quantiles(qs)
+        else:
+            raise ValueError(f"Unknown approximation method: {method!r}")
+        q1_lo, q1, q1_hi, q3_lo, q3, q3_hi = estimates
+        IQR = q3 - q1
+        report = {"method": method, "rows": rows, "sample_rows": sample_rows, "rank_error": rank_error,
+                  "confidence": confidence if method == "sample" else 0.99, "columns": {}}
+        for j, column in enumerate(columns):
+            report["columns"][column] = {
+                "q1": float(q1[j]), "q3": float(q3[j]),
+                "lower": float(q1[j] - 1.5 * IQR[j]), "upper": float(q3[j] + 1.5 * IQR[j]),
+                "lower_range": [float(2.5 * q1_lo[j] - 1.5 * q3_hi[j]), float(2.5 * q1_hi[j] - 1.5 * q3_lo[j])],
+                "upper_range": [float(2.5 * q3_lo[j] - 1.5 * q1_hi[j]), float(2.5 * q3_hi[j] - 1.5 * q1_lo[j])],
+            }
+        return report
+    def _iqr_bounds(self, data, columns):
+        quartiles = data[columns].quantile([0.25, 0.75])
+        Q1 = quartiles.iloc[0].to_numpy(dtype="float64")
+        Q3 = quartiles.iloc[1].to_numpy(dtype="float64")
+        IQR = Q3 - Q1
+        return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+    def _treat_outliers_iqr_vectorized(self, data, columns, bounds=None):
+        if len(columns) == 0:
+            return data
+        lower_bound, upper_bound = self._iqr_bounds(data, columns) if bounds is None else bounds
+        values = data[columns].to_numpy(dtype="float64", na_value=np.nan)
+        inside = (values >= lower_bound) & (values <= upper_bound)
+        keep = inside.all(axis=1)
+        before_rows = data.shape[0]
+        data = data[keep]
+        after_rows = data.shape[0]
+        if before_rows:
+            flagged = dict(zip(columns, (~inside).sum(axis=0).tolist()))
+            self._say(f"Outlier treatment on {len(columns)} columns: {(before_rows - after_rows)*100/before_rows} % rows removed "
+                      f"(rows outside bounds per column: {flagged}).")
         return data
     def _treat_outliers_iqr(self, data, column):
         Q1 = data[column].quantile(0.25)
@@ -30,14 +1085,303 @@ class Transform(Extract):
         before_rows = data.shape[0]
         data = data[(data[column] >= lower_bound) & (data[column] <= upper_bound)]
         after_rows = data.shape[0]
-        print(f"Outlier treatment on '{column}': {(before_rows - after_rows)*100/before_rows} % rows removed.")
+        self._say(f"Outlier treatment on '{column}': {(before_rows - after_rows)*100/before_rows} % rows removed.")
         return data
-    def normalization(self):
-        data=self.outlier_treatment()
+    @memoized_stage
+    def normalization(self, outlier_engine="vectorized", engine="inplace", dtype="float64"):
+        """Min-Max scale every numeric column of the outlier-treated data.
+
+        engine="inplace" copies the numeric columns once into a contiguous (column-major) block,
+        scales it with in-place ufuncs and builds the result around that block without further
+        copies; dtype="float32" halves the block. Constant columns scale to 0. engine="columnwise"
+        is the original per-column assignment (constant columns become NaN).
+        """
+        if engine == "inplace" and outlier_engine == "vectorized" and self._use_arrow():
+            return self.normalize_arrow(dtype).to_pandas()
+        data=self.outlier_treatment(engine=outlier_engine)
+        self.metrics.note(rows_in=len(data))
         numeric_columns = data.select_dtypes(include=['number']).columns
-        for column in numeric_columns:
-            min_val = data[column].min()
-            max_val = data[column].max()
-            data[column] = (data[column] - min_val) / (max_val - min_val)
-        print("Normalization completed using Min-Max scaling.")
-        return data
\ No newline at end of file
+        if engine == "columnwise":
+            data = data.copy()  # the cached outlier result must not be modified
+            for column in numeric_columns:
+                with self.metrics.column(column):
+                    min_val = data[column].min()
+                    max_val = data[column].max()
+                    data[column] = (data[column] - min_val) / (max_val - min_val)
+        elif engine == "inplace":
+            data = self._minmax_inplace(data, numeric_columns, np.dtype(dtype))
+        else:
+            raise ValueError(f"Unknown normalization engine: {engine!r}")
+        self._say("Normalization completed using Min-Max scaling.")
+        return data
+    def _minmax_inplace(self, data, columns, dtype):
+        if dtype.kind != "f":
+            raise ValueError(f"Normalization dtype must be a float type, got {dtype}")
+        block = _float_block(data, columns, dtype)
+        _minmax_scale_block(block)
+        return _frame_with_block(data, columns, block)
+
+    # ---------- group-wise stages ----------
+
+    @staticmethod
+    def _group_codes(data, by):
+        """Group number (0..n_groups-1) per row; null keys form their own groups."""
+        return data.groupby(by, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+    @memoized_stage
+    def outlier_treatment_grouped(self, by):
+        """IQR filter per group of the by column(s): one groupby quantile call for every group and
+        numeric column, bounds broadcast back to the rows by group code."""
+        by = [by] if isinstance(by, str) else list(by)
+        data=self.data_cleaning(**self.cleaning)
+        self.metrics.note(rows_in=len(data))
+        columns = [c for c in data.select_dtypes(include=['number']).columns if c not in by]
+        if len(columns) == 0 or len(data) == 0:
+            return data
+        codes = self._group_codes(data, by)
+        quartiles = data[columns].groupby(codes).quantile([0.25, 0.75])
+        Q1 = quartiles.xs(0.25, level=1).to_numpy(dtype="float64")
+        Q3 = quartiles.xs(0.75, level=1).to_numpy(dtype="float64")
+        IQR = Q3 - Q1
+        lower_bound, upper_bound = Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+        keep = np.ones(len(data), dtype=bool)
+        for j, column in enumerate(columns):
+            with self.metrics.column(column):
+                values = data[column].to_numpy(dtype="float64", na_value=np.nan)
+                keep &= (values >= lower_bound[codes, j]) & (values <= upper_bound[codes, j])
+        before_rows = data.shape[0]
+        data = data[keep]
+        self._say(f"Grouped outlier treatment on {len(columns)} columns over {len(Q1)} groups: "
+                  f"{(before_rows - data.shape[0])*100/before_rows} % rows removed.")
+        return data
+    @memoized_stage
+    def normalization_grouped(self, by, dtype="float64"):
+        """Min-Max scale numeric columns within each group of the grouped outlier-treated data.
+
+        Per-group min/max come from one groupby aggregation; each column is then scaled in place
+        in a contiguous block (constant groups scale to 0).
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind != "f":
+            raise ValueError(f"Normalization dtype must be a float type, got {dtype}")
+        data=self.outlier_treatment_grouped(by)
+        self.metrics.note(rows_in=len(data))
+        by = [by] if isinstance(by, str) else list(by)
+        columns = [c for c in data.select_dtypes(include=['number']).columns if c not in by]
+        if len(columns) == 0 or len(data) == 0:
+            return data
+        codes = self._group_codes(data, by)
+        grouped = data[columns].groupby(codes)
+        mins = grouped.min().to_numpy(dtype=dtype)
+        span = grouped.max().to_numpy(dtype=dtype) - mins
+        block = _float_block(data, columns, dtype)
+        for j, column in enumerate(columns):
+            with self.metrics.column(column):
+                column_span = span[codes, j]
+                np.subtract(block[:, j], mins[codes, j], out=block[:, j])
+                np.divide(block[:, j], column_span, out=block[:, j], where=column_span != 0)
+        self._say(f"Normalization completed using Min-Max scaling per group ({len(mins)} groups).")
+        return _frame_with_block(data, columns, block)
+
+    # ---------- fit / apply ----------
+
+    @instrumented_stage
+    def fit(self, outlier_engine="vectorized"):
+        """Capture IQR bounds (on the cleaned data) and min/max (on the filtered data) as TransformStats."""
+        data=self.data_cleaning(**self.cleaning)
+        columns = list(data.select_dtypes(include=['number']).columns)
+        if not columns:
+            return TransformStats([], [], [], [], [])
+        if outlier_engine == "sequential":  # bounds as the column-by-column filter saw them
+            lower_bound, upper_bound = [], []
+            for column in columns:
+                lo, hi = self._iqr_bounds(data, [column])
+                lower_bound.append(lo[0])
+                upper_bound.append(hi[0])
+                data = data[(data[column] >= lo[0]) & (data[column] <= hi[0])]
+        else:
+            lower_bound, upper_bound = self._iqr_bounds(data, columns)
+            data = self.outlier_treatment(engine=outlier_engine)
+        return TransformStats(columns, lower_bound, upper_bound,
+                              data[columns].min().to_numpy(dtype="float64"),
+                              data[columns].max().to_numpy(dtype="float64"))
+
+    @instrumented_stage
+    def fit_parallel(self, workers=None, partitions=None, kll_k=200):
+        """fit() across row partitions in a process pool, using mergeable sketches.
+
+        Each partition summarizes its numeric columns (exact count/sum/min/max, KLL quartiles
+        with rank error ~2.3/k**0.97); the summaries merge into global IQR bounds, then each
+        partition filters against those bounds and reports min/max, which merge exactly.
+        """
+        data=self.data_cleaning(**self.cleaning)
+        columns = list(data.select_dtypes(include=['number']).columns)
+        if not columns:
+            return TransformStats([], [], [], [], [])
+        workers = workers or os.cpu_count() or 1
+        values = data[columns].to_numpy(dtype="float64", na_value=np.nan)
+        parts = [p for p in np.array_split(values, partitions or workers) if len(p)]
+        if not parts:  # nothing left after cleaning: NaN statistics, as fit() gives
+            nan = np.full(len(columns), np.nan)
+            return TransformStats(columns, nan, nan, nan, nan)
+        with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+            merged = None
+            for summaries in pool.map(_summarize_partition, parts, [kll_k] * len(parts)):
+                summaries = [NumericSummary.from_dict(d) for d in summaries]
+                merged = summaries if merged is None else [m.merge(s) for m, s in zip(merged, summaries)]
+            quartiles = np.array([m.quantiles([0.25, 0.75]) for m in merged], dtype="float64")
+            IQR = quartiles[:, 1] - quartiles[:, 0]
+            lower_bound, upper_bound = quartiles[:, 0] - 1.5 * IQR, quartiles[:, 1] + 1.5 * IQR
+            n = len(parts)
+            results = list(pool.map(_filter_partition, parts, [lower_bound] * n, [upper_bound] * n))
+        min_val = np.min([r[0] for r in results], axis=0)
+        max_val = np.max([r[1] for r in results], axis=0)
+        return TransformStats(columns, lower_bound, upper_bound, min_val, max_val)
+
+    def normalization_parallel(self, workers=None, partitions=None, kll_k=200):
+        """Cleaned, outlier-filtered, min-max scaled data with statistics computed partition-parallel."""
+        return self.apply(self.fit_parallel(workers, partitions, kll_k), clean=True)
+
+    def apply(self, stats, data=None, clean=False, filter_outliers=True):
+        """Apply fitted stats to data (default self.df) in one vectorized pass (see TransformStats.apply).
+
+        clean=True first cleans a DataFrame with the data_cleaning options in self.cleaning.
+        """
+        if data is None:
+            data = self.data_cleaning(**self.cleaning) if clean else self.df
+        elif clean and isinstance(data, pd.DataFrame):
+            data = self._clean_pandas(data, **self.cleaning)
+        return stats.apply(data, filter_outliers)
+
+    # ---------- out-of-core (chunked) mode ----------
+
+    def _stream_clean(self, chunks):
+        """Yield deduplicated, null-free chunks (duplicates detected across chunks by row digest)."""
+        seen = RowDigestSet(max_items=self.max_digests_in_memory)
+        try:
+            for chunk in chunks:
+                first = seen.add_new(row_digests(chunk, self.digest_bits))
+                yield chunk[first].dropna()
+        finally:
+            seen.close()
+
+    def _stream_bounds(self, chunksize, quantiles, kll_k, encoding):
+        """Pass 1: IQR bounds per numeric column of the cleaned data (sketch or exact quantiles)."""
+        columns, sketches, spills = None, {}, {}
+        rows_seen, cleaned = [0], 0
+        spill_dir = tempfile.mkdtemp(prefix=".transform_stats_", dir=self.destination)
+        try:
+            for chunk in self._stream_clean(self._counted(self.iter_frames(encoding, chunksize), rows_seen)):
+                if columns is None:
+                    columns = list(chunk.select_dtypes(include=["number"]).columns)
+                cleaned += len(chunk)
+                for column in columns:
+                    values = chunk[column].to_numpy(dtype="float64", na_value=np.nan)
+                    if quantiles == "exact":
+                        if column not in spills:
+                            spills[column] = open(os.path.join(spill_dir, f"{len(spills)}.f8"), "ab")
+                        spills[column].write(values.tobytes())
+                    else:
+                        sketches.setdefault(column, KLLSketch(k=kll_k)).update(values)
+            rows = rows_seen[0]
+            bounds = {}
+            for column in columns or []:
+                if quantiles == "exact":
+                    spills[column].close()
+                    values = np.fromfile(spills[column].name, dtype="float64")
+                    Q1, Q3 = np.quantile(values, [0.25, 0.75]) if values.size else (np.nan, np.nan)
+                    del values
+                else:
+                    Q1, Q3 = sketches[column].quantiles([0.25, 0.75])
+                IQR = Q3 - Q1
+                bounds[column] = (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+        finally:
+            for fh in spills.values():
+                fh.close()
+            shutil.rmtree(spill_dir, ignore_errors=True)
+        return bounds, rows, cleaned
+
+    @staticmethod
+    def _counted(chunks, counter):
+        for chunk in chunks:
+            counter[0] += len(chunk)
+            yield chunk
+
+    @instrumented_stage
+    def stream(self, out_path, stage="normalization", chunksize=100_000, quantiles="sketch", kll_k=200,
+               encoding="utf-8"):
+        """Run cleaning / outlier treatment / normalization over chunks, for data larger than RAM.
+
+        Pass 1 dedups (row-hash set) and drops nulls while collecting per-column quartiles (KLL
+        sketches, or exact quantiles from per-column spill files). Pass 2 re-streams the input,
+        applies the same cleaning and the IQR bounds (vectorized semantics) and writes the
+        result; for normalization the surviving rows are spilled while their min/max is
+        accumulated, then scaled into out_path. Returns a summary dict.
+        """
+        if stage not in {"data_cleaning", "outlier_treatment", "normalization"}:
+            raise ValueError(f"Unknown stage: {stage!r}")
+        if quantiles not in {"sketch", "exact"}:
+            raise ValueError(f"quantiles must be 'sketch' or 'exact', got {quantiles!r}")
+        out_path = Path(out_path)
+        self.destination.mkdir(parents=True, exist_ok=True)
+        report = {"stage": stage, "quantiles": quantiles}
+
+        if stage == "data_cleaning":
+            rows_seen = [0]
+            with self.open_csv(out_path, encoding=encoding) as sink:
+                for chunk in self._stream_clean(self._counted(self.iter_frames(encoding, chunksize), rows_seen)):
+                    sink.write(chunk)
+            report.update(rows_in=rows_seen[0], rows_out=sink.rows)
+            return report
+
+        bounds, rows, cleaned = self._stream_bounds(chunksize, quantiles, kll_k, encoding)
+        self._say(f"Data cleaned: {(rows - cleaned)*100/max(rows, 1)} % rows removed.")
+        columns = list(bounds)
+        lower = np.array([bounds[c][0] for c in columns], dtype="float64")
+        upper = np.array([bounds[c][1] for c in columns], dtype="float64")
+
+        def filtered():
+            for chunk in self._stream_clean(self.iter_frames(encoding, chunksize)):
+                if columns:
+                    values = chunk[columns].to_numpy(dtype="float64", na_value=np.nan)
+                    chunk = chunk[((values >= lower) & (values <= upper)).all(axis=1)]
+                yield chunk
+
+        report.update(rows_in=rows, rows_cleaned=cleaned, bounds={c: list(b) for c, b in bounds.items()})
+        if stage == "outlier_treatment":
+            with self.open_csv(out_path, encoding=encoding) as sink:
+                for chunk in filtered():
+                    sink.write(chunk)
+            report["rows_out"] = sink.rows
+            self._say(f"Outlier treatment on {len(columns)} columns: {(cleaned - sink.rows)*100/max(cleaned, 1)} % rows removed.")
+            return report
+
+        spill_dir = tempfile.mkdtemp(prefix=".transform_spill_", dir=self.destination)
+        try:
+            lo = np.full(len(columns), np.inf)
+            hi = np.full(len(columns), -np.inf)
+            parts = []
+            for i, chunk in enumerate(filtered()):
+                if len(chunk) and columns:
+                    values = chunk[columns].to_numpy(dtype="float64", na_value=np.nan)
+                    np.fmin(lo, values.min(axis=0, initial=np.inf, where=~np.isnan(values)), out=lo)
+                    np.fmax(hi, values.max(axis=0, initial=-np.inf, where=~np.isnan(values)), out=hi)
+                part = os.path.join(spill_dir, f"{i:06d}.pkl")
+                chunk.to_pickle(part)
+                parts.append(part)
+            span = hi - lo
+            with self.open_csv(out_path, encoding=encoding) as sink:
+                for part in parts:
+                    chunk = pd.read_pickle(part)
+                    if columns:
+                        values = chunk[columns].to_numpy(dtype="float64", na_value=np.nan, copy=True)
+                        np.subtract(values, lo, out=values)
+                        # constant columns are all zeros after the subtraction, as in _minmax_scale_block
+                        np.divide(values, span, out=values, where=span != 0)
+                        chunk[columns] = values
+                    sink.write(chunk)
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+        report.update(rows_out=sink.rows, min={c: float(v) for c, v in zip(columns, lo)},
+                      max={c: float(v) for c, v in zip(columns, hi)})
+        self._say("Normalization completed using Min-Max scaling.")
+        return report
@@ -0,0 +1,197 @@
+"""Arrow-native Transform stages: dedup, null handling, IQR filtering and min-max scaling on pyarrow Tables.
+
+Used by Transform when its backend is "arrow" (picked automatically for Parquet, Feather and ORC
+sources), so data read by Extract's Arrow readers is cleaned with Arrow compute kernels and only
+converted to pandas at the API boundary, or not at all when written straight back out.
+"""
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # the pandas backend does not need pyarrow
+    pa = pc = None
+
+NATIVE_FORMATS = {".parquet", ".feather", ".orc"}
+_ROW = "__transform_row__"
+
+
+def read_table(path: Path, columns: Optional[List[str]] = None) -> "pa.Table":
+    """Read a Parquet / Feather / ORC file as one Table (memory-mapped where the format allows)."""
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True)
+    if ext == ".feather":
+        import pyarrow.feather as pf
+        return pf.read_table(path, columns=columns, memory_map=True)
+    if ext == ".orc":
+        import pyarrow.orc as pa_orc
+        return pa_orc.ORCFile(str(path)).read(columns=columns)
+    raise ValueError(f"Not an Arrow-native format: {ext}")
+
+
+def numeric_columns(table: "pa.Table") -> List[str]:
+    """Integer and floating-point columns (booleans excluded, as in select_dtypes('number'))."""
+    return [f.name for f in table.schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+
+
+def _is_null(column):
+    return pc.is_null(column, nan_is_null=True)
+
+
+def _set_column(table: "pa.Table", name: str, column, keep_nullable: bool = False) -> "pa.Table":
+    """Replace column name; when its type changes, its pandas metadata entry follows.
+
+    Otherwise to_pandas() casts a float column back to the file's nullable integer dtype (Int64)
+    and fails on fractional values. keep_nullable maps Int64 to Float64 rather than float64.
+    """
+    old_type = table.schema.field(name).type
+    table = table.set_column(table.schema.get_field_index(name), name, column)
+    metadata = table.schema.metadata or {}
+    if column.type == old_type or b"pandas" not in metadata:
+        return table
+    pandas_meta = json.loads(metadata[b"pandas"])
+    numpy_type = str(np.dtype(column.type.to_pandas_dtype()))
+    for entry in pandas_meta.get("columns", []):
+        if entry.get("field_name", entry.get("name")) == name:
+            extension = (entry.get("numpy_type") or "")[:1].isupper()  # Int64, Float64, ...
+            entry["numpy_type"] = numpy_type.capitalize() if keep_nullable and extension else numpy_type
+            entry["pandas_type"] = numpy_type
+            entry["metadata"] = None
+    return table.replace_schema_metadata({**metadata, b"pandas": json.dumps(pandas_meta).encode("utf-8")})
+
+
+# ---------- cleaning ----------
+
+def first_occurrences(table: "pa.Table") -> "pa.Array":
+    """Sorted row positions of the first occurrence of each distinct row (one hash group_by)."""
+    rows = pa.array(np.arange(table.num_rows, dtype=np.int64))
+    grouped = table.append_column(_ROW, rows).group_by(table.column_names, use_threads=False)
+    first = grouped.aggregate([(_ROW, "min")]).column(f"{_ROW}_min")
+    return pc.take(first, pc.array_sort_indices(first))
+
+
+def fill_statistic(column, how: str):
+    """Median (numeric columns) or mode of a column, as a Python value (None when all null)."""
+    if how == "median" and (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+        median = pc.quantile(pc.drop_null(column), q=0.5, interpolation="linear")
+        return median[0].as_py() if len(median) else None
+    counts = pc.value_counts(pc.drop_null(column))
+    if len(counts) == 0:
+        return None
+    top = pc.equal(counts.field("counts"), pc.max(counts.field("counts")))
+    return pc.min(pc.filter(counts.field("values"), top)).as_py()  # smallest of ties, like Series.mode()
+
+
+def clean(table: "pa.Table", nulls: str = "drop", subset: Optional[List[str]] = None, thresh: Optional[int] = None,
+          fill_value=None) -> Tuple["pa.Table", Dict]:
+    """Drop duplicate rows, then handle nulls in subset (see Transform.data_cleaning); returns (table, fills).
+
+    NaN counts as null, as in pandas. The surviving rows are gathered with one take.
+    """
+    subset = table.column_names if subset is None else list(subset)
+    first = first_occurrences(table)
+    fills: Dict = {}
+    if nulls == "drop":
+        if thresh is None:
+            null_rows = None
+            for name in subset:
+                mask = _is_null(table.column(name))
+                null_rows = mask if null_rows is None else pc.or_(null_rows, mask)
+            keep = pc.invert(null_rows) if null_rows is not None else None
+        else:
+            non_null = None
+            for name in subset:
+                valid = pc.cast(pc.invert(_is_null(table.column(name))), pa.int32())
+                non_null = valid if non_null is None else pc.add(non_null, valid)
+            keep = pc.greater_equal(non_null, thresh) if non_null is not None else None
+        if keep is not None:
+            first = pc.filter(first, pc.take(keep, first))
+        return table.take(first), fills
+    if nulls not in {"median", "mode", "constant", "keep"}:
+        raise ValueError(f"Unknown null strategy: {nulls!r}")
+    if nulls == "constant" and fill_value is None:
+        raise ValueError('nulls="constant" needs a fill_value')
+    table = table.take(first)
+    if nulls == "keep":
+        return table, fills
+    for name in subset:
+        column = table.column(name)
+        missing = _is_null(column)
+        if not pc.any(missing).as_py():
+            continue
+        value = fill_value if nulls == "constant" else fill_statistic(column, nulls)
+        if value is None:
+            continue
+        if pa.types.is_integer(column.type) and not float(value).is_integer():
+            column = pc.cast(column, pa.float64())
+        fills[name] = value
+        filled = pc.if_else(missing, pa.scalar(value).cast(column.type), column)
+        table = _set_column(table, name, filled, keep_nullable=True)
+    return table, fills
+
+
+# ---------- outliers and scaling ----------
+
+def iqr_filter(table: "pa.Table", columns: Optional[List[str]] = None) -> Tuple["pa.Table", Dict]:
+    """Keep rows inside Q1 - 1.5 IQR .. Q3 + 1.5 IQR of every numeric column; returns (table, bounds)."""
+    columns = numeric_columns(table) if columns is None else columns
+    bounds: Dict = {}
+    keep = None
+    for name in columns:
+        column = table.column(name)
+        q1, q3 = (v.as_py() for v in pc.quantile(column, q=[0.25, 0.75], interpolation="linear"))
+        if q1 is None:  # all null: every row is outside, as NaN comparisons are in pandas
+            inside = pa.array(np.zeros(table.num_rows, dtype=bool))
+        else:
+            lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            bounds[name] = (lower, upper)
+            inside = pc.fill_null(pc.and_(pc.greater_equal(column, lower), pc.less_equal(column, upper)), False)
+        keep = inside if keep is None else pc.and_(keep, inside)
+    return (table.filter(keep) if keep is not None else table), bounds
+
+
+def minmax(table: "pa.Table", columns: Optional[List[str]] = None, dtype: str = "float64") -> "pa.Table":
+    """Min-max scale numeric columns to [0, 1] as dtype (constant columns become 0)."""
+    target = pa.from_numpy_dtype(np.dtype(dtype))
+    for name in numeric_columns(table) if columns is None else columns:
+        column = pc.cast(table.column(name), target)
+        stats = pc.min_max(column)
+        low, high = stats["min"].as_py(), stats["max"].as_py()
+        if low is not None:
+            shifted = pc.subtract(column, pa.scalar(low, target))
+            column = shifted if high == low else pc.divide(shifted, pa.scalar(high - low, target))
+        table = _set_column(table, name, column)
+    return table
+
+
+# ---------- output ----------
+
+def write_table(table: "pa.Table", path: Path) -> Path:
+    """Write table as CSV / Parquet / Feather (by extension) through a temp file renamed into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    ext = path.suffix.lower()
+    try:
+        if ext == ".parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp)
+        elif ext == ".feather":
+            import pyarrow.feather as pf
+            pf.write_feather(table, tmp)
+        else:
+            import pyarrow.csv as pa_csv
+            pa_csv.write_csv(table, tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
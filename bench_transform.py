@@ -0,0 +1,260 @@
+"""Benchmarks for Transform's data_cleaning / outlier_treatment / normalization stages.
+
+Synthetic frames are generated locally (seeded) for every combination of row count, column
+count, duplicate ratio, null ratio and outlier rate. Each stage is timed with its engines:
+
+    memory     the in-memory stage engines (pandas/hash dedup, vectorized/sequential/approximate
+               IQR, inplace/columnwise normalization, the lazy plan)
+    chunked    Transform.stream over a file written once per dataset (Parquet with pyarrow, else CSV)
+    parallel   Transform.normalization_parallel (process pool, mergeable sketches)
+
+Peak memory is the tracemalloc peak of the stage in this process (process-pool workers are not
+included). Results can be saved as a baseline and later runs compared against it; any case
+slower or larger than the baseline by more than --threshold is a regression (exit status 1).
+
+    python bench_transform.py --rows 1e4,1e5,1e6 --cols 10,50 --save-baseline bench_baseline.json
+    python bench_transform.py --rows 1e4,1e5,1e6 --cols 10,50 --compare bench_baseline.json --threshold 0.2
+"""
+import argparse
+import gc
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from Extract import _HAS_PYARROW
+from Transform import Transform
+
+STAGES = ("data_cleaning", "outlier_treatment", "normalization")
+GENERATE_CHUNK = 1_000_000
+
+
+# ---------- synthetic data ----------
+
+def synthetic_chunks(rows: int, cols: int, dup_ratio: float = 0.05, null_ratio: float = 0.01,
+                     outlier_rate: float = 0.01, seed: int = 0,
+                     chunk_rows: int = GENERATE_CHUNK) -> Iterator[pd.DataFrame]:
+    """Seeded frames of cols numeric columns plus a low-cardinality "segment" string column.
+
+    Numeric values are normal; outlier_rate of the cells are scaled by 50, null_ratio of the
+    cells are NaN and dup_ratio of the rows repeat an earlier row of the same chunk.
+    """
+    rng = np.random.default_rng(seed)
+    done = 0
+    while done < rows:
+        n = min(chunk_rows, rows - done)
+        values = rng.normal(size=(n, cols))
+        outliers = rng.random((n, cols)) < outlier_rate
+        values[outliers] *= 50
+        values[rng.random((n, cols)) < null_ratio] = np.nan
+        dups = np.flatnonzero(rng.random(n) < dup_ratio)
+        dups = dups[dups > 0]
+        sources = rng.integers(0, dups) if len(dups) else dups  # an earlier row for each duplicate
+        values[dups] = values[sources]
+        frame = pd.DataFrame(values, columns=[f"x{j}" for j in range(cols)])
+        segments = rng.integers(0, 16, n)
+        segments[dups] = segments[sources]
+        frame.insert(0, "segment", pd.Series(segments).map(lambda s: f"seg{s:02d}"))
+        yield frame
+        done += n
+
+
+def synthetic_frame(rows: int, cols: int, **kwargs) -> pd.DataFrame:
+    frames = list(synthetic_chunks(rows, cols, **kwargs))
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def write_synthetic(path_dir: Path, rows: int, cols: int, **kwargs) -> Path:
+    """The synthetic dataset written chunk by chunk (never fully in memory)."""
+    if _HAS_PYARROW:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        path = path_dir / "bench.parquet"
+        writer = None
+        try:
+            for chunk in synthetic_chunks(rows, cols, **kwargs):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(str(path), table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+    path = path_dir / "bench.csv"
+    for i, chunk in enumerate(synthetic_chunks(rows, cols, **kwargs)):
+        chunk.to_csv(path, mode="a" if i else "w", header=not i, index=False)
+    return path
+
+
+# ---------- measurement ----------
+
+def measure(setup: Callable[[], Callable[[], object]], repeat: int) -> Dict:
+    """Best wall time over repeat untraced runs, then the tracemalloc peak of one more run; setup() is not timed."""
+    seconds = []
+    for _ in range(repeat):
+        run = setup()
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started)
+    run = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(min(seconds), 6), "peak_bytes": peak}
+
+
+def _transform(source: Path, work: Path, df: Optional[pd.DataFrame], warm: tuple = ()) -> Transform:
+    """A quiet Transform over df (or the source file) with the listed prerequisite stages already run."""
+    t = Transform(source, work, verbose=False, instrument=False)
+    if df is not None:
+        t.df = df
+    for stage in warm:
+        getattr(t, stage)()
+    return t
+
+
+def cases(stage: str, engines: List[str], workers: Optional[int], chunksize: int) -> Dict[str, Callable]:
+    """engine label -> callable(source, work, df) returning a zero-arg run for this stage."""
+    out: Dict[str, Callable] = {}
+    if "memory" in engines:
+        if stage == "data_cleaning":
+            for dedup in ("pandas", "hash"):
+                out[f"memory:{dedup}"] = lambda s, w, df, d=dedup: (
+                    lambda t=_transform(s, w, df): t.data_cleaning(dedup=d))
+        elif stage == "outlier_treatment":
+            for engine in ("vectorized", "sequential", "approximate"):
+                out[f"memory:{engine}"] = lambda s, w, df, e=engine: (
+                    lambda t=_transform(s, w, df, ("data_cleaning",)): t.outlier_treatment(engine=e))
+        else:
+            for engine, dtype in (("inplace", "float64"), ("inplace", "float32"), ("columnwise", "float64")):
+                out[f"memory:{engine}:{dtype}"] = lambda s, w, df, e=engine, dt=dtype: (
+                    lambda t=_transform(s, w, df, ("data_cleaning", "outlier_treatment")):
+                    t.normalization(engine=e, dtype=dt))
+            out["memory:plan"] = lambda s, w, df: (
+                lambda t=_transform(s, w, df): t.clean().clip_outliers().normalize().collect(engine="memory"))
+    if "chunked" in engines:
+        out["chunked"] = lambda s, w, df: (
+            lambda t=_transform(s, w, None): t.stream(w / "out.csv", stage=stage, chunksize=chunksize))
+    if "parallel" in engines and stage == "normalization":
+        out["parallel"] = lambda s, w, df: (
+            lambda t=_transform(s, w, df, ("data_cleaning",)): t.normalization_parallel(workers=workers))
+    return out
+
+
+def run_benchmarks(args) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    grid = product(args.rows, args.cols, args.dup, args.null, args.outliers)
+    for rows, cols, dup, null, outliers in grid:
+        data_kwargs = dict(dup_ratio=dup, null_ratio=null, outlier_rate=outliers, seed=args.seed)
+        work = Path(tempfile.mkdtemp(prefix="bench_transform_"))
+        try:
+            source = write_synthetic(work, rows, cols, **data_kwargs)
+            in_memory = "memory" in args.engines or "parallel" in args.engines
+            df = synthetic_frame(rows, cols, **data_kwargs) if in_memory else None
+            for stage in args.stages:
+                for label, make in cases(stage, args.engines, args.workers, args.chunksize).items():
+                    case = f"{stage}/{label}/rows={rows}/cols={cols}/dup={dup}/null={null}/outliers={outliers}"
+                    try:
+                        result = measure(lambda: make(source, work, df), args.repeat)
+                    except MemoryError:
+                        result = {"error": "MemoryError"}
+                    results[case] = result
+                    print(f"{case:<90} {result.get('seconds', '-'):>10} s  "
+                          f"{_mib(result.get('peak_bytes')):>10} MiB")
+            del df
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def _mib(n: Optional[int]) -> str:
+    return "-" if n is None else f"{n / 2**20:.1f}"
+
+
+# ---------- baselines ----------
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float,
+            min_seconds: float = 0.05) -> List[str]:
+    """Cases slower or with a higher peak than the baseline by more than threshold (a fraction).
+
+    Timings below min_seconds in the baseline are too noisy to compare and only their memory is checked.
+    """
+    regressions = []
+    for case, now in results.items():
+        base = baseline.get(case)
+        if not base or "error" in now or "error" in base:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if metric == "seconds" and (base.get(metric) or 0) < min_seconds:
+                continue
+            if base.get(metric) and now.get(metric) is not None and now[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{case}: {metric} {base[metric]} -> {now[metric]} "
+                                   f"(+{(now[metric] / base[metric] - 1) * 100:.1f} %)")
+    return regressions
+
+
+def _numbers(kind):
+    return lambda text: [kind(float(v)) for v in text.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Transform stages on synthetic data.")
+    parser.add_argument("--rows", type=_numbers(int), default=[10_000, 100_000],
+                        help="Comma-separated row counts, e.g. 1e4,1e6,1e8 (default: 1e4,1e5).")
+    parser.add_argument("--cols", type=_numbers(int), default=[10], help="Comma-separated numeric column counts.")
+    parser.add_argument("--dup", type=_numbers(float), default=[0.05], help="Duplicate row ratios.")
+    parser.add_argument("--null", type=_numbers(float), default=[0.01], help="Null cell ratios.")
+    parser.add_argument("--outliers", type=_numbers(float), default=[0.01], help="Outlier cell rates.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to run.")
+    parser.add_argument("--engines", default="memory,chunked,parallel",
+                        help="Comma-separated engine families: memory, chunked, parallel.")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Chunk rows for the chunked engine.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for the parallel engine.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is reported.")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed.")
+    parser.add_argument("--json", default=None, help="Write all results to this JSON file.")
+    parser.add_argument("--save-baseline", default=None, help="Save results as the baseline JSON file.")
+    parser.add_argument("--compare", default=None, help="Baseline JSON file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown / memory growth vs the baseline (default: 0.2 = 20 %%).")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="Baseline timings below this are not compared (too noisy; default: 0.05).")
+    args = parser.parse_args()
+    args.stages = [s for s in args.stages.split(",") if s]
+    args.engines = [e for e in args.engines.split(",") if e]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {sorted(unknown)}")
+
+    results = run_benchmarks(args)
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"✖ {len(regressions)} regressions over {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✔ No regressions over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""On-disk cache of Transform results, stored as Arrow IPC files and memory-mapped back on a hit.
+
+Layout under the cache directory:
+
+    entries/<key>.arrow   one result per key; the file mtime is the LRU clock (refreshed on hits)
+    stats.json            cumulative hits / misses / stores / evictions (best effort across processes)
+
+A key is the SHA-256 of the source fingerprint (size, mtime, content hash), the stage chain with
+its parameters and any reader options that change the parsed frame.
+"""
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_BYTES = 2 * 2**30
+_HASH_BLOCK = 1 << 20
+
+_fingerprints: Dict = {}
+
+
+def source_fingerprint(path: Path, full_hash: bool = False) -> Dict:
+    """Size, mtime and a BLAKE2 hash of the file (first and last MiB, or every byte with full_hash)."""
+    path = Path(path)
+    st = path.stat()
+    memo = (str(path.resolve()), st.st_size, st.st_mtime_ns, full_hash)
+    if memo in _fingerprints:
+        return _fingerprints[memo]
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if full_hash or st.st_size <= 2 * _HASH_BLOCK:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                h.update(block)
+        else:
+            h.update(f.read(_HASH_BLOCK))
+            f.seek(-_HASH_BLOCK, os.SEEK_END)
+            h.update(f.read(_HASH_BLOCK))
+    fingerprint = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": h.hexdigest(),
+                   "hash_scope": "full" if full_hash or st.st_size <= 2 * _HASH_BLOCK else "head+tail"}
+    _fingerprints[memo] = fingerprint
+    return fingerprint
+
+
+def cache_key(**parts) -> str:
+    """Stable key for JSON-able parts (anything else is keyed by its repr)."""
+    payload = json.dumps(dict(parts, version=CACHE_VERSION), sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class UncacheableResult(ValueError):
+    """A result that cannot be stored as an Arrow table."""
+
+
+class ResultCache:
+    """Size-bounded LRU cache of DataFrames on disk.
+
+    Hits are memory-mapped, so numeric columns without nulls are read-only views of the cache
+    file; copy a hit before modifying it in place.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_BYTES):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("The result cache requires pyarrow; install pyarrow to enable it.")
+        self.root = Path(root)
+        self.entries = self.root / "entries"
+        self.max_bytes = max_bytes
+        self.entries.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.entries / f"{key}.arrow"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """The cached frame for key, or None (counted as a miss)."""
+        import pyarrow as pa
+        path = self._path(key)
+        try:
+            table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        except (FileNotFoundError, pa.ArrowInvalid):
+            self._count("misses")
+            return None
+        try:
+            os.utime(path)  # most recently used
+        except FileNotFoundError:
+            pass  # evicted by another process; the mapping stays valid
+        self._count("hits")
+        return table.to_pandas(split_blocks=True)
+
+    def put(self, key: str, df: pd.DataFrame) -> Path:
+        """Store df under key (atomically), then evict least recently used entries over max_bytes.
+
+        Raises UncacheableResult when df has no Arrow representation (e.g. mixed-type object columns).
+        """
+        import pyarrow as pa
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            raise UncacheableResult(str(e)) from e
+        path = self._path(key)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with pa.OSFile(str(tmp), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._count("stores")
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes; returns the number removed."""
+        entries = []
+        for path in self.entries.glob("*.arrow"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def clear(self) -> None:
+        for path in self.entries.glob("*.arrow"):
+            path.unlink(missing_ok=True)
+
+    # ---------- statistics ----------
+
+    def _read_counters(self) -> Dict[str, int]:
+        try:
+            with open(self.root / "stats.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        counters = self._read_counters()
+        counters[name] = counters.get(name, 0) + n
+        path = self.root / "stats.json"
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(counters, f)
+        os.replace(tmp, path)
+
+    def stats(self) -> Dict:
+        """Entries, bytes on disk and cumulative hit/miss/store/eviction counts with the hit rate."""
+        counters = self._read_counters()
+        sizes = [p.stat().st_size for p in self.entries.glob("*.arrow")]
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {"entries": len(sizes), "bytes": sum(sizes), "max_bytes": self.max_bytes,
+                "hits": hits, "misses": misses, "stores": counters.get("stores", 0),
+                "evictions": counters.get("evictions", 0),
+                "hit_rate": hits / (hits + misses) if hits + misses else None}
@@ -0,0 +1,265 @@
+"""Mergeable streaming sketches (distinct counts and quantiles)."""
+import base64
+import json
+import math
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values) -> np.ndarray:
+    """Hash a Series/array of values to uint64 (stable across processes)."""
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values)
+    try:
+        return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+    except TypeError:  # unhashable objects (lists/dicts from JSON arrays): hash a canonical JSON text
+        text = values.map(lambda v: json.dumps(v, sort_keys=True, default=str))
+        return pd.util.hash_pandas_object(text, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length() for uint64 arrays (exact, via 32-bit halves)."""
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide="ignore"):
+        bl_hi = np.where(hi > 0, np.floor(np.log2(np.maximum(hi, 1))) + 33, 0)
+        bl_lo = np.where(lo > 0, np.floor(np.log2(np.maximum(lo, 1))) + 1, 0)
+    return np.where(hi > 0, bl_hi, bl_lo).astype(np.int64)
+
+
+# ---------- distinct counts ----------
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch; relative error is about 1.04 / sqrt(2**p)."""
+
+    def __init__(self, p: int = 12):
+        if not 4 <= p <= 18:
+            raise ValueError(f"HyperLogLog precision must be in [4, 18], got {p}")
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, values) -> None:
+        """Add a Series/array of values (nulls should be dropped by the caller)."""
+        if len(values) == 0:
+            return
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """Add pre-computed uint64 hashes."""
+        width = 64 - self.p
+        idx = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        rho = (width - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge HyperLogLog sketches with p={self.p} and p={other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))  # linear counting for small cardinalities
+        return int(round(raw))
+
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def to_dict(self) -> Dict:
+        return {"p": self.p, "registers": base64.b64encode(self.registers.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "HyperLogLog":
+        hll = cls(p=int(d["p"]))
+        hll.registers = np.frombuffer(base64.b64decode(d["registers"]), dtype=np.uint8).copy()
+        return hll
+
+
+# ---------- quantiles ----------
+
+class KLLSketch:
+    """KLL quantile sketch over numeric values; mergeable, accuracy governed by k."""
+
+    _C = 2.0 / 3.0
+    _MIN_CAPACITY = 8
+    _BATCH = 1 << 16  # values sorted at a time by update()
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        if k < self._MIN_CAPACITY:
+            raise ValueError(f"KLL k must be >= {self._MIN_CAPACITY}, got {k}")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(self._MIN_CAPACITY, int(math.ceil(self.k * self._C ** depth)))
+
+    def update(self, values) -> None:
+        """Add a Series/array of numeric values; NaNs are ignored."""
+        arr = np.asarray(values, dtype=np.float64)
+        arr = arr[~np.isnan(arr)]
+        if arr.size == 0:
+            return
+        self.n += int(arr.size)
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+        for start in range(0, arr.size, self._BATCH):
+            self._insert(arr[start:start + self._BATCH])
+        self._compress()
+
+    def _insert(self, batch: np.ndarray) -> None:
+        """Add a batch of at most _BATCH values, sorted once.
+
+        A batch larger than level 0 skips the intermediate levels: h compactions in a row keep
+        every 2**h-th sorted item from one random offset, so they are done as one strided take.
+        The remainder stays on level 0 with weight 1.
+        """
+        if batch.size <= self._capacity(0):
+            self.levels[0] = np.concatenate([self.levels[0], batch])
+            return
+        h = max(1, int(math.log2(batch.size / self.k)))
+        stride = 1 << h
+        items = np.sort(batch)
+        full = items.size - items.size % stride
+        while len(self.levels) <= h:
+            self.levels.append(np.empty(0, dtype=np.float64))
+        self.levels[h] = np.concatenate([self.levels[h], items[int(self._rng.integers(stride)):full:stride]])
+        self.levels[0] = np.concatenate([self.levels[0], items[full:]])
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                keep = items[-1:] if items.size % 2 else items[:0]
+                even = items[:items.size - keep.size]
+                promoted = even[int(self._rng.integers(2))::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                level = 0  # capacities shift when a level is added
+                continue
+            level += 1
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        if other.n == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        qs = list(qs)
+        if self.n == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(lv.size, 2 ** i, dtype=np.float64) for i, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        out: List[Optional[float]] = []
+        for q in qs:
+            if q <= 0:
+                out.append(self.min)
+            elif q >= 1:
+                out.append(self.max)
+            else:
+                i = int(np.searchsorted(cum, q * cum[-1], side="left"))
+                out.append(float(items[min(i, items.size - 1)]))
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def rank_error(self) -> float:
+        """Normalized rank error (99% confidence) for this k."""
+        return 2.296 / self.k ** 0.9723
+
+    def to_dict(self) -> Dict:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": None if self.n == 0 else self.min,
+            "max": None if self.n == 0 else self.max,
+            "levels": [lv.tolist() for lv in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "KLLSketch":
+        sk = cls(k=int(d["k"]))
+        sk.n = int(d["n"])
+        if sk.n:
+            sk.min, sk.max = float(d["min"]), float(d["max"])
+        sk.levels = [np.asarray(lv, dtype=np.float64) for lv in d["levels"]] or [np.empty(0, dtype=np.float64)]
+        return sk
+
+
+# ---------- numeric column summaries ----------
+
+class NumericSummary:
+    """Exact count/sum/min/max plus a KLL sketch for quantiles; partitions summarize and merge."""
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = KLLSketch(k=k, seed=seed)
+
+    def update(self, values) -> None:
+        arr = np.asarray(values, dtype=np.float64)
+        arr = arr[~np.isnan(arr)]
+        if arr.size == 0:
+            return
+        self.count += int(arr.size)
+        self.sum += float(arr.sum())
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+        self.sketch.update(arr)
+
+    def merge(self, other: "NumericSummary") -> "NumericSummary":
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        return self.sketch.quantiles(qs)
+
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> Dict:
+        return {"count": self.count, "sum": self.sum,
+                "min": None if self.count == 0 else self.min, "max": None if self.count == 0 else self.max,
+                "kll": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "NumericSummary":
+        summary = cls(k=int(d["kll"]["k"]))
+        summary.count, summary.sum = int(d["count"]), float(d["sum"])
+        if summary.count:
+            summary.min, summary.max = float(d["min"]), float(d["max"])
+        summary.sketch = KLLSketch.from_dict(d["kll"])
+        return summary
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from Transform import Transform
+
+
+@pytest.fixture
+def int64_parquet(tmp_path):
+    path = tmp_path / "in.parquet"
+    pd.DataFrame({"a": pd.array([1, None, 2, 3, 4], dtype="Int64"), "b": [1.0, 2.0, 3.0, 4.0, 5.0]}).to_parquet(path)
+    return path
+
+
+def test_normalization_of_nullable_int_column(int64_parquet, tmp_path):
+    t = Transform(int64_parquet, tmp_path / "out", verbose=False, backend="arrow")
+    result = t.normalization()
+    assert result["a"].tolist() == pytest.approx([0.0, 1 / 3, 2 / 3, 1.0])
+
+
+def test_fractional_median_fill_of_nullable_int_column(int64_parquet, tmp_path):
+    arrow = Transform(int64_parquet, tmp_path / "out", verbose=False, backend="arrow").data_cleaning(nulls="median")
+    pandas = Transform(int64_parquet, tmp_path / "out", verbose=False, backend="pandas").data_cleaning(nulls="median")
+    assert arrow["a"].tolist() == [1.0, 2.5, 2.0, 3.0, 4.0]
+    pd.testing.assert_frame_equal(arrow, pandas)
@@ -0,0 +1,190 @@
+"""Shared-filesystem work queue so several Extract workers (on any node) can split one run.
+
+Layout under the queue directory (only POSIX rename/mtime semantics are relied on):
+
+    config.json                  run options written by the coordinator
+    todo/<task>.json             pending work items
+    claimed/<task>@<worker>.json items being converted (claimed by an atomic rename out of todo/)
+    heartbeats/<worker>          touched periodically by each live worker
+    done/<task>.json             run-report entry for each finished item
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from Extract import convert_one, extract_options, iter_paths, print_summary, safe_slug, write_run_report
+
+
+def _write_json_atomic(path: Path, obj: Dict) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class WorkQueue:
+    """A directory-backed queue of conversion tasks."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.todo = self.root / "todo"
+        self.claimed = self.root / "claimed"
+        self.heartbeats = self.root / "heartbeats"
+        self.done = self.root / "done"
+
+    # ---------- coordinator ----------
+
+    def create(self, paths: List[Path], config: Dict) -> int:
+        """Write the work list and run config; returns the number of tasks enqueued."""
+        for d in (self.todo, self.claimed, self.heartbeats, self.done):
+            d.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.root / "config.json", config)
+        for i, path in enumerate(paths):
+            task = f"{i:06d}_{safe_slug(path.stem)}"
+            _write_json_atomic(self.todo / f"{task}.json", {"task": task, "input": str(path.resolve())})
+        return len(paths)
+
+    def config(self) -> Dict:
+        with open(self.root / "config.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # ---------- workers ----------
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Atomically claim one pending task (rename todo -> claimed); None when nothing is pending."""
+        for item in sorted(self.todo.glob("*.json")):
+            target = self.claimed / f"{item.stem}@{worker}.json"
+            try:
+                os.rename(item, target)
+            except FileNotFoundError:
+                continue  # another worker won the race
+            with open(target, "r", encoding="utf-8") as f:
+                task = json.load(f)
+            task["_claim"] = str(target)
+            return task
+        return None
+
+    def complete(self, task: Dict, entry: Dict) -> None:
+        entry = dict(entry, task=task["task"])
+        _write_json_atomic(self.done / f"{task['task']}.json", entry)
+        Path(task["_claim"]).unlink(missing_ok=True)
+
+    def beat(self, worker: str) -> float:
+        """Touch this worker's heartbeat; returns its mtime (the filesystem's notion of 'now')."""
+        hb = self.heartbeats / worker
+        hb.touch()
+        os.utime(hb)
+        return hb.stat().st_mtime
+
+    def reclaim(self, now: float, stale_after: float) -> int:
+        """Move tasks held by workers whose heartbeat is older than stale_after back to todo/."""
+        moved = 0
+        for item in self.claimed.glob("*@*.json"):
+            task, owner = item.stem.rsplit("@", 1)
+            if (self.done / f"{task}.json").exists():
+                item.unlink(missing_ok=True)  # worker died after reporting, before releasing its claim
+                continue
+            try:
+                last = (self.heartbeats / owner).stat().st_mtime
+            except FileNotFoundError:
+                try:
+                    last = item.stat().st_mtime
+                except FileNotFoundError:
+                    continue  # completed or reclaimed by another worker meanwhile
+            if now - last > stale_after:
+                try:
+                    os.rename(item, self.todo / f"{task}.json")
+                    moved += 1
+                except FileNotFoundError:
+                    pass
+        return moved
+
+    def pending(self) -> bool:
+        return any(self.todo.glob("*.json")) or any(self.claimed.glob("*.json"))
+
+    def entries(self) -> List[Dict]:
+        out = []
+        for item in sorted(self.done.glob("*.json")):
+            with open(item, "r", encoding="utf-8") as f:
+                out.append(json.load(f))
+        return out
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, queue: WorkQueue, worker: str, interval: float):
+        super().__init__(daemon=True)
+        self.queue, self.worker, self.interval = queue, worker, interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.queue.beat(self.worker)
+
+
+def run_worker(queue: WorkQueue, heartbeat: float = 10.0, stale_after: float = 60.0,
+               worker: Optional[str] = None) -> List[Dict]:
+    """Claim and convert tasks until the queue is drained; returns this worker's entries."""
+    worker = worker or f"{safe_slug(socket.gethostname())}-{os.getpid()}"
+    cfg = queue.config()
+    queue.beat(worker)
+    hb = _Heartbeat(queue, worker, heartbeat)
+    hb.start()
+    entries: List[Dict] = []
+    try:
+        while True:
+            task = queue.claim(worker)
+            if task is None:
+                if queue.reclaim(queue.beat(worker), stale_after):
+                    continue
+                if not queue.pending():
+                    break
+                time.sleep(min(heartbeat, 1.0))  # others still busy; stay around to take over if they die
+                continue
+            entry = convert_one(Path(task["input"]), Path(cfg["out"]), cfg["encoding"], cfg["chunksize"],
+                                **cfg["options"])
+            entry["worker"] = worker
+            queue.complete(task, entry)
+            entries.append(entry)
+            mark = "✔ Converted" if entry["status"] == "ok" else "✖ Error converting"
+            print(f"{mark}: {task['input']} [{worker}]")
+    finally:
+        hb.stopped.set()
+        (queue.heartbeats / worker).unlink(missing_ok=True)
+    return entries
+
+
+def run_cli(args) -> None:
+    """Handle Extract's --queue/--role modes."""
+    queue = WorkQueue(Path(args.queue))
+    if args.role == "coordinator":
+        if args.input is None:
+            raise SystemExit("--input is required for --role coordinator")
+        paths = sorted(p for p in iter_paths(Path(args.input), args.pattern, args.recursive) if p.is_file())
+        out_dir = Path(args.out).resolve()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        options = extract_options(args)
+        for name in ("dialect_cache", "schema"):  # workers may run elsewhere or in another directory
+            if options[name] and options[name] != "infer":
+                options[name] = str(Path(options[name]).resolve())
+        n = queue.create(paths, {"out": str(out_dir), "encoding": args.encoding, "chunksize": args.chunksize,
+                                 "options": options})
+        print(f"✔ Enqueued {n} files in {queue.root}")
+    elif args.role == "worker":
+        run_worker(queue, heartbeat=args.heartbeat, stale_after=args.stale_after)
+    elif args.role == "collect":
+        out_dir = Path(queue.config()["out"])
+        entries = queue.entries()
+        profile_path = out_dir / "_run.profile.json" if queue.config()["options"].get("profile") else None
+        write_run_report(entries, Path(args.report) if args.report else out_dir / "_run.report.json", profile_path)
+        if queue.pending():
+            print("Warning: queue still has pending or claimed tasks; report is partial.")
+        print_summary(entries)
+    else:
+        raise SystemExit("--queue requires --role coordinator|worker|collect")